@@ -3,10 +3,16 @@
 # Disable pylint's E1101, which breaks completely on migen
 #pylint:disable=E1101
 
+import fnmatch
+import itertools
+
 from litex.soc.interconnect.csr import _CompoundCSR
 from .csr import DocumentedCSRRegion
 from .module import gather_submodules, ModuleNotDocumented, DocumentedModule, DocumentedInterrupts
 from .rst import reflow
+from .lookup import RegisterIndex
+from .output import open_output, DirectoryOutput
+from . import sphinxext
 
 sphinx_configuration = """
 project = '{}'
@@ -69,133 +75,170 @@ def print_svd_register(csr, csr_address, description, svd):
     print('                    </fields>', file=svd)
     print('                </register>', file=svd)
 
-def generate_svd(soc, buildpath, vendor="litex", name="soc", filename=None, description=None):
-    interrupts = {}
-    for csr, irq in sorted(soc.soc_interrupt_map.items()):
-        interrupts[csr] = irq
+def print_svd_memory(mem, mem_address, svd):
+    """Print a memory as a single ``dim`` array with one element per bus word"""
+    data_bits = min(mem.width, mem.busword)
+    print('                <register>', file=svd)
+    print('                    <dim>{}</dim>'.format(mem.depth * mem.words_per_entry()), file=svd)
+    print('                    <dimIncrement>0x4</dimIncrement>', file=svd)
+    print('                    <name>{}[%s]</name>'.format(mem.name), file=svd)
+    if mem.description is not None:
+        print('                    <description><![CDATA[{}]]></description>'.format(mem.description), file=svd)
+    print('                    <addressOffset>0x{:04x}</addressOffset>'.format(mem_address), file=svd)
+    print('                    <access>{}</access>'.format(mem.access), file=svd)
+    print('                    <resetValue>0x00</resetValue>', file=svd)
+    print('                    <fields>', file=svd)
+    print('                        <field>', file=svd)
+    print('                            <name>data</name>', file=svd)
+    print('                            <msb>{}</msb>'.format(data_bits - 1), file=svd)
+    print('                            <bitRange>[{}:{}]</bitRange>'.format(data_bits - 1, 0), file=svd)
+    print('                            <lsb>{}</lsb>'.format(0), file=svd)
+    print('                        </field>', file=svd)
+    print('                    </fields>', file=svd)
+    print('                </register>', file=svd)
 
-    documented_regions = []
+def print_svd_registers(region, svd):
+    """Print the ``<registers>`` and ``<addressBlock>`` of a peripheral.
 
-    raw_regions = []
-    if hasattr(soc, "get_csr_regions"):
-        raw_regions = soc.get_csr_regions()
+    This output only depends on the contents of the region, not on its name
+    or base address, so identical peripherals produce identical text."""
+    csr_address = 0
+    print('            <registers>', file=svd)
+    for csr in region.csrs:
+        description = None
+        if hasattr(csr, "description"):
+            description = csr.description
+        if isinstance(csr, _CompoundCSR) and len(csr.simple_csrs) > 1:
+            is_first = True
+            for i in range(len(csr.simple_csrs)):
+                (start, length, name) = sub_csr_bit_range(region.busword, csr, i)
+                sub_name = csr.name.upper() + "_" + name
+                if length > 0:
+                    bits_str = "Bits {}-{} of `{}`.".format(start, start+length, csr.name)
+                else:
+                    bits_str = "Bit {} of `{}`.".format(start, csr.name)
+                if is_first:
+                    if description is not None:
+                        print_svd_register(csr.simple_csrs[i], csr_address, bits_str + " " + description, svd)
+                    else:
+                        print_svd_register(csr.simple_csrs[i], csr_address, bits_str, svd)
+                    is_first = False
+                else:
+                    print_svd_register(csr.simple_csrs[i], csr_address, bits_str, svd)
+                csr_address = csr_address + 4
+        else:
+            print_svd_register(csr, csr_address, description, svd)
+            csr_address = csr_address + 4
+    for mem in region.memories:
+        mem_address = mem.address - region.origin
+        print_svd_memory(mem, mem_address, svd)
+        csr_address = max(csr_address, mem_address + mem.size())
+    print('            </registers>', file=svd)
+    print('            <addressBlock>', file=svd)
+    print('                <offset>0</offset>', file=svd)
+    print('                <size>0x{:x}</size>'.format(csr_address), file=svd)
+    print('                <usage>registers</usage>', file=svd)
+    print('            </addressBlock>', file=svd)
+
+def print_svd_peripheral(region, interrupts, svd, registers=None):
+    """Print a ``<peripheral>`` block.  If ``registers`` is specified, it
+    is used verbatim in place of the output of :obj:`print_svd_registers`."""
+    print('        <peripheral>', file=svd)
+    print('            <name>{}</name>'.format(region.name.upper()), file=svd)
+    print('            <baseAddress>0x{:08X}</baseAddress>'.format(region.origin), file=svd)
+    print('            <groupName>{}</groupName>'.format(region.name.upper()), file=svd)
+    if len(region.sections) > 0:
+        print('            <description><![CDATA[{}]]></description>'.format(reflow(region.sections[0].body())), file=svd)
+    if registers is None:
+        print_svd_registers(region, svd)
     else:
-        for region_name, region in soc.csr_regions.items():
-            raw_regions.append((region_name, region.origin, region.busword, region.obj))
-    for csr_region in raw_regions:
-        documented_regions.append(DocumentedCSRRegion(csr_region))
+        svd.write(registers)
+    if region.name in interrupts:
+        print('            <interrupt>', file=svd)
+        print('                <name>{}</name>'.format(region.name), file=svd)
+        print('                <value>{}</value>'.format(interrupts[region.name]), file=svd)
+        print('            </interrupt>', file=svd)
+    print('        </peripheral>', file=svd)
 
-    if filename is None:
-        filename = name + ".svd"
-    with open(buildpath + "/" + filename, "w", encoding="utf-8") as svd:
-        print('<?xml version="1.0" encoding="utf-8"?>', file=svd)
-        print('', file=svd)
-        print('<device schemaVersion="1.1" xmlns:xs="http://www.w3.org/2001/XMLSchema-instance" xs:noNamespaceSchemaLocation="CMSIS-SVD.xsd" >', file=svd)
-        print('    <vendor>{}</vendor>'.format(vendor), file=svd)
-        print('    <name>{}</name>'.format(name.upper()), file=svd)
-        if description is not None:
-            print('    <description><![CDATA[{}]]></description>'.format(reflow(description)), file=svd)
-        print('', file=svd)
-        print('    <addressUnitBits>8</addressUnitBits>', file=svd)
-        print('    <width>32</width>', file=svd)
-        print('    <size>32</size>', file=svd)
-        print('    <access>read-write</access>', file=svd)
-        print('    <resetValue>0x00000000</resetValue>', file=svd)
-        print('    <resetMask>0xFFFFFFFF</resetMask>', file=svd)
-        print('', file=svd)
-        print('    <peripherals>', file=svd)
-
-        for region in documented_regions:
-            csr_address = 0
-            print('        <peripheral>', file=svd)
-            print('            <name>{}</name>'.format(region.name.upper()), file=svd)
-            print('            <baseAddress>0x{:08X}</baseAddress>'.format(region.origin), file=svd)
-            print('            <groupName>{}</groupName>'.format(region.name.upper()), file=svd)
-            if len(region.sections) > 0:
-                print('            <description><![CDATA[{}]]></description>'.format(reflow(region.sections[0].body())), file=svd)
-            print('            <registers>', file=svd)
-            for csr in region.csrs:
-                description = None
-                if hasattr(csr, "description"):
-                    description = csr.description
-                if isinstance(csr, _CompoundCSR) and len(csr.simple_csrs) > 1:
-                    is_first = True
-                    for i in range(len(csr.simple_csrs)):
-                        (start, length, name) = sub_csr_bit_range(region.busword, csr, i)
-                        sub_name = csr.name.upper() + "_" + name
-                        if length > 0:
-                            bits_str = "Bits {}-{} of `{}`.".format(start, start+length, csr.name)
-                        else:
-                            bits_str = "Bit {} of `{}`.".format(start, csr.name)
-                        if is_first:
-                            if description is not None:
-                                print_svd_register(csr.simple_csrs[i], csr_address, bits_str + " " + description, svd)
-                            else:
-                                print_svd_register(csr.simple_csrs[i], csr_address, bits_str, svd)
-                            is_first = False
-                        else:
-                            print_svd_register(csr.simple_csrs[i], csr_address, bits_str, svd)
-                        csr_address = csr_address + 4
-                else:
-                    print_svd_register(csr, csr_address, description, svd)
-                    csr_address = csr_address + 4
-            print('            </registers>', file=svd)
-            print('            <addressBlock>', file=svd)
-            print('                <offset>0</offset>', file=svd)
-            print('                <size>0x{:x}</size>'.format(csr_address), file=svd)
-            print('                <usage>registers</usage>', file=svd)
-            print('            </addressBlock>', file=svd)
-            if region.name in interrupts:
-                print('            <interrupt>', file=svd)
-                print('                <name>{}</name>'.format(region.name), file=svd)
-                print('                <value>{}</value>'.format(interrupts[region.name]), file=svd)
-                print('            </interrupt>', file=svd)
-            print('        </peripheral>', file=svd)
-        print('    </peripherals>', file=svd)
-        print('</device>', file=svd)
+def print_svd_header(svd, vendor, name, description):
+    print('<?xml version="1.0" encoding="utf-8"?>', file=svd)
+    print('', file=svd)
+    print('<device schemaVersion="1.1" xmlns:xs="http://www.w3.org/2001/XMLSchema-instance" xs:noNamespaceSchemaLocation="CMSIS-SVD.xsd" >', file=svd)
+    print('    <vendor>{}</vendor>'.format(vendor), file=svd)
+    print('    <name>{}</name>'.format(name.upper()), file=svd)
+    if description is not None:
+        print('    <description><![CDATA[{}]]></description>'.format(reflow(description)), file=svd)
+    print('', file=svd)
+    print('    <addressUnitBits>8</addressUnitBits>', file=svd)
+    print('    <width>32</width>', file=svd)
+    print('    <size>32</size>', file=svd)
+    print('    <access>read-write</access>', file=svd)
+    print('    <resetValue>0x00000000</resetValue>', file=svd)
+    print('    <resetMask>0xFFFFFFFF</resetMask>', file=svd)
+    print('', file=svd)
+    print('    <peripherals>', file=svd)
 
-def generate_docs(soc, base_dir, project_name="LiteX SoC Project",
-            author="Anonymous", sphinx_extensions=[], quiet=False, note_pulses=False):
-    """Possible extra extensions:
-        [
-            'm2r',
-            'recommonmark',
-            'sphinx_rtd_theme',
-            'sphinx_autodoc_typehints',
-        ]
-    """
+def print_svd_footer(svd):
+    print('    </peripherals>', file=svd)
+    print('</device>', file=svd)
 
-    # Ensure the target directory is a full path
-    if base_dir[-1] != '/':
-        base_dir = base_dir + '/'
+class DocumentedSoC:
+    """A detached, plain-data model of an SoC's documentation
 
-    # Ensure the output directory exists
-    import pathlib
-    pathlib.Path(base_dir + "/_static").mkdir(parents=True, exist_ok=True)
+    This documents every CSR region and module of ``soc`` up front, and then
+    copies everything that is needed for rendering (including section titles,
+    bodies and formats) into plain data.  Once constructed, it holds no
+    references to the live migen design, so the SoC may be freed before
+    the model is passed to :obj:`generate_docs` or :obj:`generate_svd`::
 
-    # Create various Sphinx plumbing
-    with open(base_dir + "conf.py", "w", encoding="utf-8") as conf:
-        import datetime
-        year = datetime.datetime.now().year
-        sphinx_ext_str = ""
-        for ext in sphinx_extensions:
-            sphinx_ext_str += "\n    \"{}\",".format(ext)
-        print(sphinx_configuration.format(project_name, year, author, author, sphinx_ext_str), file=conf)
-    if not quiet:
-        print("Generate the documentation by running `sphinx-build -M html {} {}_build`".format(base_dir, base_dir))
+        model = lxsocdoc.DocumentedSoC(soc)
+        del soc
+        lxsocdoc.generate_docs(model, "build/documentation")
+
+    ``include`` and ``exclude`` limit the model to some regions and modules,
+    as described in :obj:`is_selected`.
+    """
+    def __init__(self, soc, include=None, exclude=None):
+        self.interrupts = select_interrupts(get_interrupts(soc), include, exclude)
+        seen_modules = set()
+        self.regions = [region.detach() for region in document_regions(soc, self.interrupts, seen_modules, include, exclude)]
+        self.modules = [module.detach() for module in document_modules(soc, self.interrupts, seen_modules, include, exclude)]
 
-    # Gather all interrupts so we can easily map IRQ numbers to CSR sections
+def get_interrupts(soc):
+    """Gather all interrupts so we can easily map IRQ numbers to CSR sections"""
+    if isinstance(soc, DocumentedSoC):
+        return soc.interrupts
     interrupts = {}
     for csr, irq in sorted(soc.soc_interrupt_map.items()):
         interrupts[csr] = irq
+    return interrupts
 
-    # Convert each CSR region into a DocumentedCSRRegion.
-    # This process will also expand each CSR into a DocumentedCSR,
-    # which means that CompoundCSRs (such as CSRStorage and CSRStatus)
-    # that are larger than the buswidth will be turned into multiple
-    # DocumentedCSRs.
-    documented_regions = []
-    seen_modules = set()
+def is_selected(name, include=None, exclude=None):
+    """Return whether the region or module ``name`` should be documented.
+
+    ``include`` and ``exclude`` are lists of names or ``fnmatch``-style
+    patterns, such as ``"uart*"``.  If ``include`` is given, only matching
+    names are selected.  Names matching ``exclude`` are never selected."""
+    if include is not None and not any(fnmatch.fnmatchcase(name, pattern) for pattern in include):
+        return False
+    if exclude is not None and any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude):
+        return False
+    return True
+
+def select_interrupts(interrupts, include=None, exclude=None):
+    """Limit an interrupt map to the selected modules"""
+    if include is None and exclude is None:
+        return interrupts
+    return {name: irq for (name, irq) in interrupts.items() if is_selected(name, include, exclude)}
+
+def select_regions(regions, include=None, exclude=None):
+    """Yield the regions of an iterable that are selected by name"""
+    for region in regions:
+        if is_selected(region.name, include, exclude):
+            yield region
+
+def get_csr_regions(soc):
+    """Return a list of `(name, origin, busword, obj)` tuples for each CSR region"""
     regions = []
     # Previously, litex contained a function to gather csr regions.
     if hasattr(soc, "get_csr_regions"):
@@ -204,30 +247,120 @@ def generate_docs(soc, base_dir, project_name="LiteX SoC Project",
         # Now we just access the regions directly.
         for region_name, region in soc.csr_regions.items():
             regions.append((region_name, region.origin, region.busword, region.obj))
-    for csr_region in regions:
+    return regions
+
+def document_regions(soc, interrupts, seen_modules, include=None, exclude=None):
+    """Convert each CSR region into a DocumentedCSRRegion.
+
+    This process will also expand each CSR into a DocumentedCSR,
+    which means that CompoundCSRs (such as CSRStorage and CSRStatus)
+    that are larger than the buswidth will be turned into multiple
+    DocumentedCSRs.
+
+    This is a generator, so only one region needs to be held in memory
+    at a time.  Each module that backs a region is added to `seen_modules`
+    as its region is generated.
+
+    Regions that are not selected by `include` and `exclude` (see
+    :obj:`is_selected`) are skipped without being documented.
+
+    If `soc` is a DocumentedSoC, its regions have already been documented
+    and are returned as they are."""
+    if isinstance(soc, DocumentedSoC):
+        yield from select_regions(soc.regions, include, exclude)
+        return
+    for csr_region in get_csr_regions(soc):
         module = None
         if hasattr(soc, csr_region[0]):
             module = getattr(soc, csr_region[0])
             seen_modules.add(module)
+        # Skipped regions still count as seen, so their modules don't
+        # get documented as additional modules instead.
+        if not is_selected(csr_region[0], include, exclude):
+            continue
         submodules = gather_submodules(module)
 
         documented_region = DocumentedCSRRegion(csr_region, module, submodules)
         if documented_region.name in interrupts:
             documented_region.document_interrupt(soc, submodules, interrupts[documented_region.name])
-        documented_regions.append(documented_region)
+        yield documented_region
+
+def document_modules(soc, interrupts, seen_modules, include=None, exclude=None):
+    """Document any modules that are not CSRs
 
-    # Document any modules that are not CSRs:
+    Modules that are not selected by `include` and `exclude` are skipped.
+    The interrupt table is always present, and lists `interrupts`."""
     additional_modules = [
         DocumentedInterrupts(interrupts),
     ]
+    if isinstance(soc, DocumentedSoC):
+        for module in soc.modules:
+            if not isinstance(module, DocumentedInterrupts) and is_selected(module.name, include, exclude):
+                additional_modules.append(module)
+        return additional_modules
     for (mod_name, mod) in soc._submodules:
-        if mod not in seen_modules:
+        if mod not in seen_modules and is_selected(mod_name, include, exclude):
             try:
                 additional_modules.append(DocumentedModule(mod_name, mod))
             except ModuleNotDocumented:
                 pass
+    return additional_modules
+
+def generate_svd(soc, buildpath, vendor="litex", name="soc", filename=None, description=None,
+            include=None, exclude=None, extra_regions=None):
+    """Generate an SVD file.  `buildpath` may be a directory, an archive
+    path or an :obj:`Output` (see :obj:`open_output`).
 
-    with open(base_dir + "index.rst", "w", encoding="utf-8") as index:
+    If `include` or `exclude` are given, only the selected peripherals
+    (see :obj:`is_selected`) are written.  `extra_regions` are written
+    after the peripherals of the SoC, as for :obj:`generate_docs`."""
+    interrupts = select_interrupts(get_interrupts(soc), include, exclude)
+
+    if filename is None:
+        filename = name + ".svd"
+    output = open_output(buildpath)
+    with output.open(filename) as svd:
+        print_svd_header(svd, vendor, name, description)
+        if isinstance(soc, DocumentedSoC):
+            for region in document_regions(soc, interrupts, set(), include, exclude):
+                print_svd_peripheral(region, interrupts, svd)
+        else:
+            # Document, print and release one region at a time
+            for csr_region in get_csr_regions(soc):
+                if not is_selected(csr_region[0], include, exclude):
+                    continue
+                print_svd_peripheral(DocumentedCSRRegion(csr_region), interrupts, svd)
+        if extra_regions is not None:
+            for region in select_regions(extra_regions, include, exclude):
+                print_svd_peripheral(region, interrupts, svd)
+        print_svd_footer(svd)
+    if output is not buildpath:
+        output.close()
+
+def copyright_year():
+    """Return the year to put in the copyright notice.
+
+    If ``SOURCE_DATE_EPOCH`` is set, it is used instead of the current time,
+    so that identical inputs produce byte-identical output."""
+    import datetime
+    import os
+    if "SOURCE_DATE_EPOCH" in os.environ:
+        epoch = int(os.environ["SOURCE_DATE_EPOCH"])
+        return datetime.datetime.fromtimestamp(epoch, tz=datetime.timezone.utc).year
+    return datetime.datetime.now().year
+
+def write_sphinx_conf(output, project_name, author, sphinx_extensions, note_pulses=False):
+    with output.open("conf.py") as conf:
+        year = copyright_year()
+        sphinx_ext_str = ""
+        for ext in sphinx_extensions:
+            sphinx_ext_str += "\n    \"{}\",".format(ext)
+        print(sphinx_configuration.format(project_name, year, author, author, sphinx_ext_str), file=conf)
+        if "lxsocdoc.sphinxext" in sphinx_extensions:
+            print("lxsocdoc_note_pulses = {}".format(note_pulses), file=conf)
+
+def write_index(output, project_name, additional_modules, region_names):
+    with output.open("index.rst") as index:
         print("""
 Documentation for {}
 {}
@@ -237,8 +370,8 @@ Documentation for {}
 """.format(project_name, "="*len("Documentation for " + project_name)), file=index)
         for module in additional_modules:
             print("    {}".format(module.name), file=index)
-        for region in documented_regions:
-            print("    {}".format(region.name), file=index)
+        for name in region_names:
+            print("    {}".format(name), file=index)
 
         if len(additional_modules) > 0:
             print("""
@@ -248,13 +381,13 @@ Modules
             for module in additional_modules:
                 print("* :doc:`{} <{}>`".format(module.name.upper(), module.name), file=index)
 
-        if len(documented_regions) > 0:
+        if len(region_names) > 0:
             print("""
 Register Groups
 ===============
 """, file=index)
-            for region in documented_regions:
-                print("* :doc:`{} <{}>`".format(region.name.upper(), region.name), file=index)
+            for name in region_names:
+                print("* :doc:`{} <{}>`".format(name.upper(), name), file=index)
 
         print("""
 Indices and tables
@@ -263,23 +396,163 @@ Indices and tables
 * :ref:`genindex`
 * :ref:`modindex`
 * :ref:`search`
+* `Register lookup <_static/lookup.html>`_
 """, file=index)
 
-    # Create a Region file for each of the documented CSR regions.
-    for region in documented_regions:
-        with open(base_dir + region.name + ".rst", "w", encoding="utf-8") as outfile:
-            region.print_region(outfile, base_dir, note_pulses)
+def copy_static(output):
+    import os
+    # Copy byte-for-byte, so the result doesn't depend on the locale
+    for filename in ["WaveDrom.js", "default.js"]:
+        output.copy(os.path.dirname(__file__) + "/../static/" + filename, "_static/" + filename)
+
+def generate_docs(soc, base_dir, project_name="LiteX SoC Project",
+            author="Anonymous", sphinx_extensions=None, quiet=False, note_pulses=False,
+            backend="sphinx", extra_regions=None, include=None, exclude=None):
+    """Possible extra extensions:
+        [
+            'm2r',
+            'recommonmark',
+            'sphinx_rtd_theme',
+            'sphinx_autodoc_typehints',
+        ]
+
+    `base_dir` may be a directory, a path ending in `.zip`, `.tar`,
+    `.tar.gz` or `.tgz` to stream the tree into an archive, or an
+    :obj:`Output` object.
+
+    If `backend` is "html", static HTML pages are rendered directly
+    into `base_dir` instead, and no Sphinx step is needed.
+
+    If `sphinx_extensions` contains "lxsocdoc.sphinxext", region pages
+    are rendered on demand during the Sphinx build instead.
+
+    `extra_regions` is an optional iterable of additional
+    DocumentedCSRRegions to document after the regions of the SoC,
+    such as the peripherals of a vendor SVD read by
+    :obj:`lxsocdoc.svdimport.import_svd`.
+
+    `include` and `exclude` are lists of region and module names or
+    patterns, such as `["uart", "timer*"]`.  Only the selected regions and
+    modules are documented, and the interrupt table only lists those.
+    See :obj:`is_selected`.
+    """
+    if backend == "html":
+        from .htmldoc import generate_html_docs
+        return generate_html_docs(soc, base_dir, project_name, quiet, note_pulses, extra_regions,
+                                  include, exclude)
+    elif backend != "sphinx":
+        raise ValueError("Unknown documentation backend: {}".format(backend))
+    if sphinx_extensions is None:
+        sphinx_extensions = []
+
+    # The target may be a directory, an archive or an Output object
+    output = open_output(base_dir)
+
+    # Create various Sphinx plumbing
+    write_sphinx_conf(output, project_name, author, sphinx_extensions, note_pulses)
+    if not quiet and isinstance(output, DirectoryOutput):
+        path = output.path
+        if path[-1] != '/':
+            path = path + '/'
+        print("Generate the documentation by running `sphinx-build -M html {} {}_build`".format(path, path))
+
+    interrupts = select_interrupts(get_interrupts(soc), include, exclude)
+    seen_modules = set()
+
+    # Create a Region file for each of the documented CSR regions.  Each
+    # region is documented, written and released before the next one is
+    # documented, keeping only what the index needs.
+    region_names = []
+    register_index = RegisterIndex()
+    regions = document_regions(soc, interrupts, seen_modules, include, exclude)
+    if extra_regions is not None:
+        regions = itertools.chain(regions, select_regions(extra_regions, include, exclude))
+    # If region pages are rendered on demand by the Sphinx extension,
+    # only write the register model and a placeholder for each page.
+    # Placeholders are left untouched if they exist, so Sphinx only
+    # re-reads the regions whose data changed.
+    model = None
+    if "lxsocdoc.sphinxext" in sphinx_extensions:
+        model = output.open_binary(sphinxext.model_filename)
+        model_writer = sphinxext.RegionModelWriter(model)
+    for region in regions:
+        region_names.append(region.name)
+        register_index.add_region(region)
+        if model is not None:
+            model_writer.add_region(region.detach())
+            with output.open(region.name + ".rst", only_if_changed=True) as outfile:
+                sphinxext.print_stub(outfile)
+        else:
+            with output.open(region.name + ".rst") as outfile:
+                region.print_region(outfile, output, note_pulses)
+    if model is not None:
+        model.close()
 
     # Create a Region file for each additional non-CSR module
+    additional_modules = document_modules(soc, interrupts, seen_modules, include, exclude)
     for region in additional_modules:
-        with open(base_dir + region.name + ".rst", "w", encoding="utf-8") as outfile:
-            region.print_region(outfile, base_dir, note_pulses)
+        with output.open(region.name + ".rst") as outfile:
+            region.print_region(outfile, output, note_pulses)
 
-    import os
-    with open(os.path.dirname(__file__) + "/../static/WaveDrom.js", "r") as wd_in:
-        with open(base_dir + "/_static/WaveDrom.js", "w") as wd_out:
-            wd_out.write(wd_in.read())
+    write_index(output, project_name, additional_modules, region_names)
+
+    # Emit the address and field lookup index alongside the static files
+    register_index.write(output)
+
+    copy_static(output)
+
+    if output is not base_dir:
+        output.close()
+
+def generate_all(soc, docs_dir=None, svd_dir=None, project_name="LiteX SoC Project",
+            author="Anonymous", sphinx_extensions=None, quiet=False, note_pulses=False,
+            backend="sphinx", vendor="litex", name="soc", filename=None, description=None,
+            extra_regions=None, include=None, exclude=None, regdb=False):
+    """Generate documentation and an SVD file from a single model of the SoC.
+
+    The SoC is documented once, as a :obj:`DocumentedSoC`, and every output
+    is rendered from that model.  This is faster than calling
+    :obj:`generate_docs` and :obj:`generate_svd` separately, and the outputs
+    always agree.  For example, the SVD file includes the event fields that
+    :obj:`DocumentedCSRRegion.document_interrupt` adds for the docs.
+
+    Arguments
+    ---------
+
+    soc: The SoC, or a :obj:`DocumentedSoC` that was exported from it.
+
+    docs_dir: If specified, documentation is written here, as by
+    :obj:`generate_docs`.
+
+    svd_dir: If specified, an SVD file is written here, as by
+    :obj:`generate_svd`.
+
+    regdb: If set, a binary register database (see :obj:`lxsocdoc.regdb`)
+    called `<name>.regdb` is written next to the SVD file.
+
+    The remaining arguments are passed on to those functions.  `extra_regions`
+    is read once, and included in every output.
+
+    Returns
+    -------
+
+    The :obj:`DocumentedSoC`, which may be passed to further tools such as
+    :obj:`lxsocdoc.validate.validate_regions` or :obj:`lxsocdoc.diff.diff_models`.
+    """
+    if isinstance(soc, DocumentedSoC):
+        model = soc
+    else:
+        model = DocumentedSoC(soc, include, exclude)
+    if extra_regions is not None:
+        extra_regions = [region.detach() for region in select_regions(extra_regions, include, exclude)]
 
-    with open(os.path.dirname(__file__) + "/../static/default.js", "r") as wd_in:
-        with open(base_dir + "/_static/default.js", "w") as wd_out:
-            wd_out.write(wd_in.read())
+    if docs_dir is not None:
+        generate_docs(model, docs_dir, project_name, author, sphinx_extensions, quiet, note_pulses,
+                      backend, extra_regions, include, exclude)
+    if svd_dir is not None:
+        generate_svd(model, svd_dir, vendor, name, filename, description,
+                     include, exclude, extra_regions)
+        if regdb:
+            from .regdb import generate_regdb
+            generate_regdb(model, svd_dir, name, None, include, exclude, extra_regions)
+    return model
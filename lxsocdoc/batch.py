@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+import copy
+import hashlib
+import io
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from . import (DocumentedSoC, document_regions, document_modules, select_interrupts,
+               print_svd_header, print_svd_registers, print_svd_peripheral,
+               print_svd_footer, write_sphinx_conf, write_index, copy_static)
+from .csr import DocumentedCSRRegion
+from .lookup import RegisterIndex
+from .output import open_output, MemoryOutput, DirectoryOutput
+
+# Placeholders for the region name and the address digits on a page
+# template.  They come from the Unicode private use area, so they can't
+# clash with the rest of the page.
+name_mark = "\ue000"
+address_mark = "\ue001"
+
+def template_name(name, prefix, mark):
+    """Replace the region prefix of a register or memory name with `mark`"""
+    if name == prefix:
+        return mark
+    if name.startswith(prefix + "_"):
+        return mark + name[len(prefix):]
+    return name
+
+class RegionPageTemplate(DocumentedCSRRegion):
+    """A copy of a detached region, moved to address 0 and with its name
+    replaced by placeholders of the same width.  Its page only depends on
+    the layout of the region, so regions that only differ in their name
+    and base address share one template.  :obj:`fill_page` turns the
+    rendered template into the page of each of them."""
+    def __init__(self, region):
+        # Copy the detached region rather than documenting a live one
+        self.__dict__.update(vars(region))
+        prefix = region.name.upper()
+        self.name = name_mark * len(region.name)
+        self.origin = 0
+        self.current_address = region.current_address - region.origin
+        self.csrs = []
+        for csr in region.csrs:
+            csr = copy.copy(csr)
+            csr.name = template_name(csr.name, prefix, self.name)
+            csr.address -= region.origin
+            self.csrs.append(csr)
+        self.memories = []
+        for mem in region.memories:
+            mem = copy.copy(mem)
+            mem.name = template_name(mem.name, prefix, self.name)
+            mem.address -= region.origin
+            self.memories.append(mem)
+
+    def format_address(self, address):
+        # As wide as a real address, so that tables keep their layout
+        return "0x{}{:07x}".format(address_mark, address)
+
+def fill_page(page, region):
+    """Fill in the name and base address of `region` on a rendered template"""
+    mark = name_mark * len(region.name)
+    # Markdown sections are cached under the region's own name
+    page = page.replace(".. mdinclude:: " + mark, ".. mdinclude:: " + region.name)
+    page = page.replace(mark, region.name.upper())
+    return re.sub(address_mark + "([0-9a-f]{7})",
+                  lambda m: "{:08x}".format(region.origin + int(m.group(1), 16)), page)
+
+def svd_registers_key(region):
+    """Identify a detached region by everything that ends up in its SVD
+    ``<registers>`` block.  The region name and base address are ignored."""
+    csrs = []
+    for csr in region.csrs:
+        state = dict(vars(csr))
+        del state["name"]
+        del state["address"]
+        state["fields"] = [vars(f) for f in csr.fields]
+        csrs.append(state)
+    memories = []
+    for mem in region.memories:
+        state = dict(vars(mem))
+        state["address"] = mem.address - region.origin
+        memories.append(state)
+    return hashlib.sha256(pickle.dumps((region.busword, csrs, memories))).hexdigest()
+
+def render_region_page(template, note_pulses):
+    """Render a pickled :obj:`RegionPageTemplate` in a worker process.
+
+    Returns the page text, along with a dict of any cache files the page
+    refers to, keyed by filename."""
+    page = io.StringIO()
+    cache = MemoryOutput()
+    pickle.loads(template).print_region(page, cache, note_pulses)
+    return (page.getvalue(), cache.files)
+
+def render_svd_registers(region):
+    """Render the SVD ``<registers>`` block of a region in a worker process"""
+    svd = io.StringIO()
+    print_svd_registers(region, svd)
+    return svd.getvalue()
+
+def generate_batch(socs, docs_dir=None, svd_dir=None, jobs=None, project_name=None,
+            author="Anonymous", sphinx_extensions=None, quiet=False, note_pulses=False,
+            vendor="litex", description=None, include=None, exclude=None):
+    """Generate documentation and SVD files for several SoC variants at once.
+
+    Arguments
+    ---------
+
+    socs (:obj:`dict`): Maps the name of each variant to its SoC, or to a
+    :obj:`DocumentedSoC` that was exported from it.
+
+    docs_dir (:obj:`str`): If specified, Sphinx documentation for each variant
+    is written to ``docs_dir/<variant>/``.
+
+    svd_dir (:obj:`str`): If specified, an SVD file for each variant is written
+    to ``svd_dir/<variant>.svd``.
+
+    Either may also be an archive path or an :obj:`Output`, as accepted by
+    :obj:`open_output`.  To put everything into a single archive, pass
+    ``subdir()`` views of one archive.
+
+    jobs (:obj:`int`): Number of worker processes.  Defaults to the number of CPUs.
+
+    project_name (:obj:`str`): Project name of the documentation.  Defaults to
+    the name of the variant.
+
+    include, exclude (:obj:`list`): Only document the regions and modules
+    whose names match, as for :obj:`lxsocdoc.generate_docs`.
+
+    Region pages and SVD peripheral blocks are rendered in a process pool.
+    Regions whose pages only differ in their name and base address are
+    rendered once, even across variants.  SVD peripheral blocks that only
+    differ in their name, base address, description or interrupt share a
+    single rendering of their registers.
+    """
+
+    if sphinx_extensions is None:
+        sphinx_extensions = []
+
+    # Build a detached model of every variant.  This must happen in this
+    # process, since the live migen design can't be sent to the workers.
+    variants = []
+    for variant, soc in socs.items():
+        if not isinstance(soc, DocumentedSoC):
+            soc = DocumentedSoC(soc, include, exclude)
+        interrupts = select_interrupts(soc.interrupts, include, exclude)
+        seen_modules = set()
+        variants.append((variant, interrupts,
+            list(document_regions(soc, interrupts, seen_modules, include, exclude)),
+            document_modules(soc, interrupts, seen_modules, include, exclude)))
+
+    # Submit each distinct page and SVD block to the pool exactly once
+    pages = {}
+    svd_blocks = {}
+    page_keys = {}
+    svd_keys = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for (variant, interrupts, documented_regions, additional_modules) in variants:
+            for region in documented_regions:
+                if docs_dir is not None:
+                    # The pickled template is both the key and what is sent
+                    # to the worker, so each region is only pickled once.
+                    template = pickle.dumps(RegionPageTemplate(region))
+                    key = hashlib.sha256(template).hexdigest()
+                    page_keys[id(region)] = key
+                    if key not in pages:
+                        pages[key] = pool.submit(render_region_page, template, note_pulses)
+                if svd_dir is not None:
+                    key = svd_registers_key(region)
+                    svd_keys[id(region)] = key
+                    if key not in svd_blocks:
+                        svd_blocks[key] = pool.submit(render_svd_registers, region)
+
+        docs_output = None
+        if docs_dir is not None:
+            docs_output = open_output(docs_dir)
+        svd_output = None
+        if svd_dir is not None:
+            svd_output = open_output(svd_dir)
+
+        for (variant, interrupts, documented_regions, additional_modules) in variants:
+            if docs_output is not None:
+                output = docs_output.subdir(variant)
+                name = project_name
+                if name is None:
+                    name = variant
+                write_sphinx_conf(output, name, author, sphinx_extensions)
+                write_index(output, name, additional_modules, [region.name for region in documented_regions])
+
+                register_index = RegisterIndex()
+                for region in documented_regions:
+                    register_index.add_region(region)
+                    (page, cache_files) = pages[page_keys[id(region)]].result()
+                    with output.open(region.name + ".rst") as outfile:
+                        outfile.write(fill_page(page, region))
+                    for (filename, contents) in cache_files.items():
+                        filename = filename.replace(name_mark * len(region.name), region.name)
+                        with output.open(filename) as cache:
+                            cache.write(contents)
+
+                for region in additional_modules:
+                    with output.open(region.name + ".rst") as outfile:
+                        region.print_region(outfile, output, note_pulses)
+
+                register_index.write(output)
+                copy_static(output)
+                if not quiet and isinstance(docs_output, DirectoryOutput):
+                    path = docs_output.path + "/" + variant + "/"
+                    print("Generate the documentation by running `sphinx-build -M html {} {}_build`".format(path, path))
+
+            if svd_output is not None:
+                with svd_output.open(variant + ".svd") as svd:
+                    print_svd_header(svd, vendor, variant, description)
+                    for region in documented_regions:
+                        registers = svd_blocks[svd_keys[id(region)]].result()
+                        print_svd_peripheral(region, interrupts, svd, registers)
+                    print_svd_footer(svd)
+
+        if docs_output is not None and docs_output is not docs_dir:
+            docs_output.close()
+        if svd_output is not None and svd_output is not svd_dir:
+            svd_output.close()
@@ -7,23 +7,32 @@ from litex.soc.interconnect.csr_bus import SRAM
 from litex.soc.interconnect.csr import _CompoundCSR, CSRStatus, CSRStorage, CSRField, _CSRBase
 from litex.soc.interconnect.csr_eventmanager import _EventSource, SharedIRQ, EventManager, EventSourceLevel, EventSourceProcess, EventSourcePulse
 
+import hashlib
+import logging
 import textwrap
 
 from .rst import print_table, reflow
+from .module import DocumentedSection
+from .output import open_output
+
+logger = logging.getLogger(__name__)
 
 class DocumentedCSRField:
+    """A plain-data copy of a field.  `field` may be a :obj:`CSRField`,
+    another :obj:`DocumentedCSRField`, or any object with the same
+    attributes."""
     def __init__(self, field):
         self.name        = field.name
         self.size        = field.size
         self.offset      = field.offset
-        self.reset_value = field.reset.value
+        self.reset_value = field.reset_value
         self.description = field.description
         self.access      = field.access
         self.pulse       = field.pulse
         self.values      = field.values
 
         # If this is part of a sub-CSR, this value will be different
-        self.start       = None
+        self.start       = getattr(field, "start", None)
 
 class DocumentedCSR:
     def trim(self, docstring):
@@ -31,7 +40,7 @@ class DocumentedCSR:
             return reflow(docstring)
         return None
 
-    def __init__(self, name, address, short_numbered_name="", short_name="", reset=0, offset=0, size=8, description=None, fields=[]):
+    def __init__(self, name, address, short_numbered_name="", short_name="", reset=0, offset=0, size=8, description=None, fields=None):
         self.name = name
         self.short_name = short_name
         self.short_numbered_name = short_numbered_name
@@ -39,19 +48,60 @@ class DocumentedCSR:
         self.offset = offset
         self.size = size
         if size == 0:
-            print("!!! Warning: creating CSR of size 0 {}".format(name))
+            logger.warning("Creating CSR of size 0 %s", name)
         self.description = self.trim(description)
         self.reset_value = reset
-        self.fields = fields
-        for f in self.fields:
-            f.description = self.trim(f.description)
+        # Work on copies, so the caller's fields (which may belong to the
+        # live design, or be shared with other CSRs) are left untouched.
+        self.fields = []
+        if fields is not None:
+            for f in fields:
+                documented_field = DocumentedCSRField(f)
+                documented_field.description = self.trim(f.description)
+                self.fields.append(documented_field)
+
+class DocumentedMemory:
+    """A memory on the CSR bus, documented as one address range
+
+    Each entry of the memory is split into as many bus words as it takes
+    to hold `width` bits, and each bus word occupies 4 bytes of address
+    space, just like a CSR.  The memory is never expanded into one
+    register per word, so large buffers stay cheap to document.
+    """
+    def __init__(self, name, address, depth, width, busword, read_only=False, description=None):
+        self.name = name
+        self.address = address
+        self.depth = depth
+        self.width = width
+        self.busword = busword
+        self.access = "read-only" if read_only else "read-write"
+        self.description = description
+
+    def words_per_entry(self):
+        return (self.width + self.busword - 1)//self.busword
+
+    def stride(self):
+        """Number of bytes of address space taken by each entry"""
+        return self.words_per_entry() * 4
+
+    def size(self):
+        """Number of bytes of address space taken by the whole memory"""
+        return self.depth * self.stride()
+
+def sram_memory(sram):
+    """Return the :obj:`Memory` that backs a CSR bus :obj:`SRAM`, if any"""
+    for special in sram._fragment.specials:
+        if isinstance(special, Memory):
+            return special
+    return None
 
 class DocumentedCSRRegion:
-    def __init__(self, csr_region, module=None, submodules=[]):
+    def __init__(self, csr_region, module=None, submodules=None):
         (self.name, self.origin, self.busword, self.raw_csrs) = csr_region
         self.current_address = self.origin
         self.sections = []
         self.csrs = []
+        self.memories = []
 
         # If the section has extra documentation, gather it.
         if isinstance(module, ModuleDoc):
@@ -62,23 +112,32 @@ class DocumentedCSRRegion:
                 self.sections.append(doc)
 
         if isinstance(self.raw_csrs, SRAM):
-            print("{}@{:x}: Found SRAM: {}".format(self.name, self.origin, self.raw_csrs))
+            self.document_sram(self.raw_csrs)
         elif isinstance(self.raw_csrs, list):
             for csr in self.raw_csrs:
                 if isinstance(csr, _CSRBase):
                     self.document_csr(csr)
                 elif isinstance(csr, SRAM):
-                    print("{}: Found SRAM in the list: {}".format(self.name, csr))
+                    self.document_sram(csr)
                 else:
-                    print("{}: Unknown module: {}".format(self.name, csr))
+                    logger.warning("%s: Unknown module: %s", self.name, csr)
         elif isinstance(self.raw_csrs, Memory):
-            self.csrs.append(DocumentedCSR(
-                self.name.upper(), self.origin, short_numbered_name=self.name.upper(), short_name=self.name.upper(), reset=0, size=self.raw_csrs.width,
-                description="{} x {}-bit memory".format(self.raw_csrs.width, self.raw_csrs.depth)
-            ))
-            print("{}@{:x}: Found memory that's {} x {} (but memories aren't documented yet)".format(self.name, self.origin, self.raw_csrs.width, self.raw_csrs.depth))
+            self.document_memory(self.raw_csrs)
         else:
-            print("{}@{:x}: Unexpected item on the CSR bus: {}".format(self.name, self.origin, self.raw_csrs))
+            logger.warning("%s@%x: Unexpected item on the CSR bus: %s", self.name, self.origin, self.raw_csrs)
+
+    def detach(self):
+        """Drop all references to live migen objects
+
+        Once detached, this region only contains plain data.  It can still be
+        rendered with :obj:`print_region`, and may be pickled.
+        """
+        self.raw_csrs = None
+        self.sections = [DocumentedSection(s) for s in self.sections]
+        # DocumentedMemory objects are already plain data
+        for csr in self.csrs:
+            csr.fields = [f if isinstance(f, DocumentedCSRField) else DocumentedCSRField(f) for f in csr.fields]
+        return self
 
     def bit_range(self, start, end, empty_if_zero=False):
         end -= 1
@@ -294,13 +353,13 @@ class DocumentedCSRRegion:
                     else:
                         d = bits_str + " " + reflow(d)
                     self.csrs.append(DocumentedCSR(
-                        sub_name, self.current_address, short_numbered_name=name.upper(), short_name=csr.name.upper(), reset=(reset>>start)&((2**length)-1),
+                        sub_name, self.current_address, short_numbered_name=name.upper(), short_name=csr.name.upper(), reset=(reset>>start)&((2**(length+1))-1),
                         offset=start,
                         description=d, fields=self.split_fields(fields, start, start + length)
                     ))
                 else:
                     self.csrs.append(DocumentedCSR(
-                        sub_name, self.current_address, short_numbered_name=name.upper(), short_name=csr.name.upper(), reset=(reset>>start)&((2**length)-1),
+                        sub_name, self.current_address, short_numbered_name=name.upper(), short_name=csr.name.upper(), reset=(reset>>start)&((2**(length+1))-1),
                         offset=start,
                         description=bits_str, fields=self.split_fields(fields, start, start + length)
                     ))
@@ -312,6 +371,30 @@ class DocumentedCSRRegion:
             ))
             self.current_address += 4
 
+    def document_memory(self, mem):
+        """Append a :obj:`DocumentedMemory` for `mem` to self.memories"""
+        if len(mem.ports) > 0:
+            # LiteX makes a memory read-only on the bus by leaving out the
+            # write port, so a memory with no write port is read-only.
+            read_only = not any(port.we is not None for port in mem.ports)
+        else:
+            # The bus port hasn't been added yet
+            read_only = getattr(mem, "bus_read_only", False)
+        name = self.name.upper()
+        if len(self.memories) > 0 or len(self.csrs) > 0:
+            name = name + "_" + (mem.name_override or "mem").upper()
+        memory = DocumentedMemory(name, self.current_address, mem.depth, mem.width, self.busword, read_only,
+            "{} x {}-bit memory".format(mem.depth, mem.width))
+        self.memories.append(memory)
+        self.current_address += memory.size()
+
+    def document_sram(self, sram):
+        mem = sram_memory(sram)
+        if mem is None:
+            logger.warning("%s@%x: Found SRAM without a memory: %s", self.name, self.current_address, sram)
+            return
+        self.document_memory(mem)
+
     def make_value_table(self, values):
         ret = ""
         max_value_width=len("Value")
@@ -360,6 +443,44 @@ class DocumentedCSRRegion:
             ret += "+-" + "-"*max_value_width + "-+-" + "-"*max_description_width + "-+\n"
         return ret
 
+    def format_address(self, address):
+        """Format an address for the region page"""
+        return "0x{:08x}".format(address)
+
+    def print_memories(self, stream):
+        title = "Memory Listing for {}".format(self.name.upper())
+        print(title, file=stream)
+        print("-" * len(title), file=stream)
+
+        mem_table = [["Memory", "Address", "Size", "Entries", "Width", "Access"]]
+        for mem in self.memories:
+            mem_table.append([":ref:`{} <{}>`".format(mem.name, mem.name), self.format_address(mem.address),
+                "0x{:x}".format(mem.size()), str(mem.depth), str(mem.width), mem.access])
+        print_table(mem_table, stream)
+
+        for mem in self.memories:
+            # A memory that fills its region is named after the region, and
+            # a second heading with that name would duplicate the page's
+            # section label.  Its details go straight under the page.
+            if mem.name != self.name.upper():
+                print("{}".format(mem.name), file=stream)
+                print("^" * len(mem.name), file=stream)
+                print("", file=stream)
+            print("`Address: {} - {}`".format(self.format_address(mem.address), self.format_address(mem.address + mem.size() - 1)), file=stream)
+            print("", file=stream)
+            if mem.description is not None:
+                print(textwrap.indent(mem.description, prefix="    "), file=stream)
+                print("", file=stream)
+            words = mem.words_per_entry()
+            if words > 1:
+                print("Each {}-bit entry is split into {} {}-bit words, most significant word first, "
+                      "so entry `n` starts at `{} + 0x{:x} * n`.".format(
+                          mem.width, words, self.busword, self.format_address(mem.address), mem.stride()), file=stream)
+            else:
+                print("Each entry occupies one {}-bit word, so entry `n` is at `{} + 4 * n`.".format(
+                    self.busword, self.format_address(mem.address)), file=stream)
+            print("", file=stream)
+
     def print_region(self, stream, base_dir, note_pulses):
         title = "{}".format(self.name.upper())
         print(title, file=stream)
@@ -379,12 +500,17 @@ class DocumentedCSRRegion:
                 if filename is not None:
                     print(".. mdinclude:: " + filename, file=stream)
                 else:
-                    temp_filename = self.name + '-' + str(hash(title)) + "." + section.format()
-                    with open(base_dir + "/" + temp_filename, "w") as cache:
+                    # Use a stable hash, since `hash()` is randomized between runs
+                    title_hash = hashlib.sha1(title.encode("utf-8")).hexdigest()
+                    temp_filename = self.name + '-' + title_hash + "." + section.format()
+                    with open_output(base_dir).open(temp_filename) as cache:
                         print(body, file=cache)
                     print(".. mdinclude:: " + temp_filename, file=stream)
             print("", file=stream)
 
+        if len(self.memories) > 0:
+            self.print_memories(stream)
+
         if len(self.csrs) > 0:
             title = "Register Listing for {}".format(self.name.upper())
             print(title, file=stream)
@@ -392,14 +518,14 @@ class DocumentedCSRRegion:
 
             csr_table = [["Register", "Address"]]
             for csr in self.csrs:
-                csr_table.append([":ref:`{} <{}>`".format(csr.name, csr.name), ":ref:`0x{:08x} <{}>`".format(csr.address, csr.name)])
+                csr_table.append([":ref:`{} <{}>`".format(csr.name, csr.name), ":ref:`{} <{}>`".format(self.format_address(csr.address), csr.name)])
             print_table(csr_table, stream)
 
             for csr in self.csrs:
                 print("{}".format(csr.name), file=stream)
                 print("^" * len(csr.name), file=stream)
                 print("", file=stream)
-                print("`Address: 0x{:08x} + 0x{:x} = 0x{:08x}`".format(self.origin, csr.address - self.origin, csr.address), file=stream)
+                print("`Address: {} + 0x{:x} = {}`".format(self.format_address(self.origin), csr.address - self.origin, self.format_address(csr.address)), file=stream)
                 print("", file=stream)
                 if csr.description is not None:
                     print(textwrap.indent(csr.description, prefix="    "), file=stream)
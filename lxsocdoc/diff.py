@@ -0,0 +1,239 @@
+from .rst import print_table
+
+class Change:
+    """A single difference between two register maps
+
+    Attributes
+    ----------
+
+    kind (:obj:`str`): A short, stable identifier for the kind of change,
+    such as ``"register-added"`` or ``"field-reset"``.
+
+    region, register, field (:obj:`str`): Where the change was found.
+    Registers are named without their region prefix, since the region
+    may have been renamed or moved.  Memories are reported as registers.
+
+    old, new: The previous and current value, where that makes sense.
+    For example, the old and new address of a register that moved.
+    """
+    def __init__(self, kind, region, register=None, field=None, old=None, new=None):
+        self.kind     = kind
+        self.region   = region
+        self.register = register
+        self.field    = field
+        self.old      = old
+        self.new      = new
+
+    def as_dict(self):
+        return {
+            "kind":     self.kind,
+            "region":   self.region,
+            "register": self.register,
+            "field":    self.field,
+            "old":      self.old,
+            "new":      self.new,
+        }
+
+    def describe(self):
+        """Return a sentence describing the change, without its location"""
+        what = self.kind.split("-")[0]
+        if self.kind.endswith("-added"):
+            return "{} added".format(what)
+        if self.kind.endswith("-removed"):
+            return "{} removed".format(what)
+        if self.kind.endswith("-renamed"):
+            return "{} renamed from `{}`".format(what, self.old)
+        if self.kind.endswith("-moved") and what == "field":
+            return "field moved from bits {} to {}".format(self.old, self.new)
+        if self.kind.endswith("-moved"):
+            return "{} moved from 0x{:08x} to 0x{:08x}".format(what, self.old, self.new)
+        if self.kind.endswith("-reset"):
+            return "reset value changed from 0x{:x} to 0x{:x}".format(self.old, self.new)
+        if self.kind.endswith("-access"):
+            return "access changed from {} to {}".format(self.old, self.new)
+        return "{} changed from {} to {}".format(what, self.old, self.new)
+
+    def __str__(self):
+        location = ".".join([x for x in [self.region, self.register, self.field] if x is not None])
+        return "{}: [{}] {}".format(location, self.kind, self.describe())
+
+def get_regions(model):
+    """Return the regions of a :obj:`DocumentedSoC`, or `model` itself if
+    it is already an iterable of regions"""
+    if hasattr(model, "regions"):
+        return model.regions
+    return model
+
+def bits(f):
+    end = f.offset + f.size - 1
+    if end == f.offset:
+        return "[{}]".format(end)
+    return "[{}:{}]".format(end, f.offset)
+
+# SVD names for the values of litex's `CSRAccess`
+access_names = {
+    0: "write-only",
+    1: "read-only",
+    2: "read-write",
+}
+
+def field_access(f):
+    """Return the access of a field as an SVD access string, or None if it
+    isn't known.  Fields of a live design use `CSRAccess`, while fields read
+    from SVD use strings or have no access at all."""
+    access = getattr(f, "access", None)
+    if isinstance(access, int):
+        return access_names.get(int(access))
+    return access
+
+def real_fields(csr):
+    """Return the fields of a register, leaving out a lone field that only
+    stands for the whole register.  generate_svd writes such a field for
+    registers without fields, and import_svd adds one to registers that
+    have none, so it isn't a real difference."""
+    if len(csr.fields) == 1:
+        f = csr.fields[0]
+        name = csr.short_name.lower()
+        if f.offset == 0 and f.name in (name, name.replace("ev_", "", 1)):
+            return []
+    return csr.fields
+
+def diff_fields(region, register, old, new, changes):
+    old_list = real_fields(old)
+    new_list = real_fields(new)
+    old_fields = {f.name: f for f in old_list}
+    new_fields = {f.name: f for f in new_list}
+    for f in old_list:
+        if f.name not in new_fields:
+            changes.append(Change("field-removed", region, register, f.name))
+    for f in new_list:
+        if f.name not in old_fields:
+            changes.append(Change("field-added", region, register, f.name))
+            continue
+        o = old_fields[f.name]
+        if (o.offset, o.size) != (f.offset, f.size):
+            changes.append(Change("field-moved", region, register, f.name, bits(o), bits(f)))
+        if o.reset_value != f.reset_value:
+            changes.append(Change("field-reset", region, register, f.name, o.reset_value, f.reset_value))
+        (old_access, new_access) = (field_access(o), field_access(f))
+        # Only compare access when both sides know it
+        if old_access is not None and new_access is not None and old_access != new_access:
+            changes.append(Change("field-access", region, register, f.name, old_access, new_access))
+
+def diff_registers(old, new, changes):
+    """Compare the registers of two versions of a region.
+
+    Registers are matched by name.  A register that disappears from one
+    address while a register of a different name appears at the same
+    offset into the region is reported as renamed."""
+    region = new.name
+    old_csrs = {csr.short_numbered_name: csr for csr in old.csrs}
+    new_csrs = {csr.short_numbered_name: csr for csr in new.csrs}
+
+    removed = {}
+    for csr in old.csrs:
+        if csr.short_numbered_name not in new_csrs:
+            removed[csr.address - old.origin] = csr
+    for csr in new.csrs:
+        name = csr.short_numbered_name
+        if name in old_csrs:
+            previous = old_csrs[name]
+        else:
+            previous = removed.pop(csr.address - new.origin, None)
+            if previous is None:
+                changes.append(Change("register-added", region, name))
+                continue
+            changes.append(Change("register-renamed", region, name, old=previous.short_numbered_name, new=name))
+        # Only report registers that moved within their region, rather
+        # than every register of a region that moved.
+        if csr.address - new.origin != previous.address - old.origin:
+            changes.append(Change("register-moved", region, name, old=previous.address, new=csr.address))
+        if csr.reset_value != previous.reset_value:
+            changes.append(Change("register-reset", region, name, old=previous.reset_value, new=csr.reset_value))
+        diff_fields(region, name, previous, csr, changes)
+    for csr in sorted(removed.values(), key=lambda csr: csr.address):
+        changes.append(Change("register-removed", region, csr.short_numbered_name))
+
+def memory_shape(mem, other):
+    """Return what to compare of the shape of `mem` against `other`.
+
+    SVD only describes a memory as an array of bus words, so a memory read
+    back from SVD has one bus word per entry.  If either side looks like
+    that, only the size and word width are compared."""
+    if mem.width == mem.busword or other.width == other.busword:
+        return (mem.size(), min(mem.width, mem.busword))
+    return (mem.depth, mem.width)
+
+def diff_memories(old, new, changes):
+    """Compare the memories of two versions of a region, by name"""
+    region = new.name
+    # Models pickled before memories were documented have no `memories`
+    old_memories = {mem.name: mem for mem in getattr(old, "memories", [])}
+    new_memories = {mem.name: mem for mem in getattr(new, "memories", [])}
+    for mem in new_memories.values():
+        if mem.name not in old_memories:
+            changes.append(Change("memory-added", region, mem.name))
+            continue
+        previous = old_memories[mem.name]
+        if mem.address - new.origin != previous.address - old.origin:
+            changes.append(Change("memory-moved", region, mem.name, old=previous.address, new=mem.address))
+        if memory_shape(mem, previous) != memory_shape(previous, mem):
+            changes.append(Change("memory-size", region, mem.name,
+                old="{} x {}-bit".format(previous.depth, previous.width), new="{} x {}-bit".format(mem.depth, mem.width)))
+        if mem.access != previous.access:
+            changes.append(Change("memory-access", region, mem.name, old=previous.access, new=mem.access))
+    for mem in old_memories.values():
+        if mem.name not in new_memories:
+            changes.append(Change("memory-removed", region, mem.name))
+
+def diff_models(old, new):
+    """Compare two register maps
+
+    ``old`` and ``new`` may each be a :obj:`DocumentedSoC` or an iterable of
+    :obj:`DocumentedCSRRegion`, such as the regions yielded by
+    :obj:`lxsocdoc.svdimport.import_svd`.  Regions and registers are
+    matched by name through dictionaries, so this runs in time linear in
+    the size of the two maps.
+
+    Returns a list of :obj:`Change` objects, in the order of ``new``, with
+    removed regions last.  The list is empty if the maps are identical.
+    """
+    old_regions = {region.name: region for region in get_regions(old)}
+    changes = []
+    seen = set()
+    for region in get_regions(new):
+        seen.add(region.name)
+        if region.name not in old_regions:
+            changes.append(Change("region-added", region.name))
+            continue
+        previous = old_regions[region.name]
+        if previous.origin != region.origin:
+            changes.append(Change("region-moved", region.name, old=previous.origin, new=region.origin))
+        diff_memories(previous, region, changes)
+        diff_registers(previous, region, changes)
+    for name in old_regions:
+        if name not in seen:
+            changes.append(Change("region-removed", name))
+    return changes
+
+def print_changes(changes, stream, title="Register Changes"):
+    """Print a reStructured Text page listing `changes`, with one table per region"""
+    print(title, file=stream)
+    print("=" * len(title), file=stream)
+    print("", file=stream)
+    if len(changes) == 0:
+        print("No registers changed.", file=stream)
+        print("", file=stream)
+        return
+
+    by_region = {}
+    for change in changes:
+        by_region.setdefault(change.region, []).append(change)
+
+    for (region, region_changes) in by_region.items():
+        print(region.upper(), file=stream)
+        print("-" * len(region), file=stream)
+        table = [["Register", "Field", "Change"]]
+        for change in region_changes:
+            table.append([change.register or "", change.field or "", change.describe()])
+        print_table(table, stream)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+import html
+import itertools
+import os
+import textwrap
+
+from . import get_interrupts, select_interrupts, select_regions, document_regions, document_modules
+from .lookup import RegisterIndex
+from .module import DocumentedInterrupts
+from .output import open_output, DirectoryOutput
+
+stylesheet = """
+body { font-family: sans-serif; max-width: 60em; margin: 2em auto; padding: 0 1em; color: #222; }
+h1, h2, h3 { font-weight: normal; }
+h3 { margin-top: 2em; border-bottom: 1px solid #ccc; }
+code, pre, .address { font-family: monospace; }
+table { border-collapse: collapse; margin: 1em 0; }
+td, th { border: 1px solid #ccc; padding: 0.2em 0.6em; text-align: left; vertical-align: top; }
+th { background: #f4f4f4; }
+table table { margin: 0.5em 0; }
+svg text { font-family: sans-serif; font-size: 11px; }
+nav a { margin-right: 1em; }
+"""
+
+# Width of a register diagram, in pixels
+diagram_width = 640
+
+def anchor(name):
+    """Return the HTML anchor for a register, matching what Sphinx generates"""
+    return name.lower().replace("_", "-")
+
+def print_header(stream, title, project_name):
+    print("<!DOCTYPE html>", file=stream)
+    print("<html>", file=stream)
+    print("<head>", file=stream)
+    print("<meta charset=\"utf-8\">", file=stream)
+    print("<title>{} - {}</title>".format(html.escape(title), html.escape(project_name)), file=stream)
+    print("<link rel=\"stylesheet\" href=\"_static/style.css\">", file=stream)
+    print("</head>", file=stream)
+    print("<body>", file=stream)
+    print("<nav><a href=\"index.html\">{}</a><a href=\"_static/lookup.html\">Register lookup</a></nav>".format(html.escape(project_name)), file=stream)
+
+def print_footer(stream):
+    print("</body>", file=stream)
+    print("</html>", file=stream)
+
+def print_text(stream, text):
+    """Print a block of text, with one ``<p>`` per paragraph"""
+    if text is None:
+        return
+    for piece in textwrap.dedent(text).split("\n\n"):
+        piece = piece.strip()
+        if piece != "":
+            print("<p>{}</p>".format(html.escape(piece)), file=stream)
+
+def print_section(stream, section):
+    title = textwrap.dedent(section.title())
+    print("<h2>{}</h2>".format(html.escape(title)), file=stream)
+    print_text(stream, section.body())
+
+def field_name(region, f, upper=False):
+    name = f.name
+    if upper:
+        name = name.upper()
+    if hasattr(f, "start") and f.start is not None:
+        name = "{}{}".format(name, region.bit_range(f.start, f.size + f.start, empty_if_zero=not upper))
+    return name
+
+def bitfield_svg(region, reg):
+    """Return an inline SVG diagram of the bits of a register.  As with
+    the WaveDrom diagrams, the most significant bit is on the left."""
+    nbits = region.busword
+    cell = diagram_width / nbits
+    top = 16
+    height = 32
+
+    # Build a list of (offset, size, name, reset) cells.  Unused bits are
+    # left showing the grey background.
+    if len(reg.fields) > 0:
+        fields = [(f.offset, f.size, field_name(region, f), f.reset_value) for f in reg.fields]
+    else:
+        fields = [(0, reg.size, reg.short_name.lower() + region.bit_range(reg.offset, reg.offset + reg.size, empty_if_zero=True), reg.reset_value)]
+
+    out = []
+    out.append("<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"{}\" height=\"{}\" viewBox=\"0 0 {} {}\">".format(
+        diagram_width + 2, top + height + 18, diagram_width + 2, top + height + 18))
+    out.append("<rect x=\"1\" y=\"{}\" width=\"{}\" height=\"{}\" fill=\"#eee\" stroke=\"#000\"/>".format(top, diagram_width, height))
+    for (offset, size, name, reset) in fields:
+        size = min(size, nbits - offset)
+        if size <= 0:
+            continue
+        x = 1 + (nbits - offset - size) * cell
+        w = size * cell
+        out.append("<rect x=\"{:g}\" y=\"{}\" width=\"{:g}\" height=\"{}\" fill=\"#fff\" stroke=\"#000\"/>".format(x, top, w, height))
+        out.append("<text x=\"{:g}\" y=\"{}\" text-anchor=\"middle\">{}</text>".format(x + w / 2, top + height // 2 + 4, html.escape(name)))
+        if reset != 0:
+            out.append("<text x=\"{:g}\" y=\"{}\" text-anchor=\"middle\">{}</text>".format(x + w / 2, top + height + 14, reset))
+        out.append("<text x=\"{:g}\" y=\"{}\" text-anchor=\"middle\">{}</text>".format(x + cell / 2, top - 4, offset + size - 1))
+        if size > 1:
+            out.append("<text x=\"{:g}\" y=\"{}\" text-anchor=\"middle\">{}</text>".format(x + w - cell / 2, top - 4, offset))
+    out.append("</svg>")
+    return "\n".join(out)
+
+def value_table(values):
+    out = ["<table>", "<tr><th>Value</th><th>Description</th></tr>"]
+    for v in values:
+        if len(v) == 2:
+            (value, description) = v
+        elif len(v) == 3:
+            (value, name, description) = v
+        else:
+            raise ValueError("Unexpected length of CSRField's value tuple")
+        out.append("<tr><td><code>{}</code></td><td>{}</td></tr>".format(html.escape(str(value)), html.escape(description)))
+    out.append("</table>")
+    return "\n".join(out)
+
+def print_memories_html(region, stream):
+    title = region.name.upper()
+    print("<h2>Memory Listing for {}</h2>".format(html.escape(title)), file=stream)
+    print("<table>", file=stream)
+    print("<tr><th>Memory</th><th>Address</th><th>Size</th><th>Entries</th><th>Width</th><th>Access</th></tr>", file=stream)
+    for mem in region.memories:
+        print("<tr><td><a href=\"#{}\">{}</a></td><td class=\"address\">0x{:08x}</td><td>0x{:x}</td><td>{}</td><td>{}</td><td>{}</td></tr>".format(
+            anchor(mem.name), html.escape(mem.name), mem.address, mem.size(), mem.depth, mem.width, mem.access), file=stream)
+    print("</table>", file=stream)
+
+    for mem in region.memories:
+        print("<h3 id=\"{}\">{}</h3>".format(anchor(mem.name), html.escape(mem.name)), file=stream)
+        print("<p class=\"address\">Address: 0x{:08x} - 0x{:08x}</p>".format(
+            mem.address, mem.address + mem.size() - 1), file=stream)
+        print_text(stream, mem.description)
+        print("<p>Entry <code>n</code> starts at <code>0x{:08x} + 0x{:x} * n</code>, and is split into {} {}-bit words, most significant word first.</p>".format(
+            mem.address, mem.stride(), mem.words_per_entry(), region.busword), file=stream)
+
+def print_region_html(region, stream, project_name, note_pulses=False):
+    """Print a complete HTML page for a :obj:`DocumentedCSRRegion`"""
+    title = region.name.upper()
+    print_header(stream, title, project_name)
+    print("<h1>{}</h1>".format(html.escape(title)), file=stream)
+
+    for section in region.sections:
+        print_section(stream, section)
+
+    if len(region.memories) > 0:
+        print_memories_html(region, stream)
+
+    if len(region.csrs) > 0:
+        print("<h2>Register Listing for {}</h2>".format(html.escape(title)), file=stream)
+        print("<table>", file=stream)
+        print("<tr><th>Register</th><th>Address</th></tr>", file=stream)
+        for csr in region.csrs:
+            print("<tr><td><a href=\"#{}\">{}</a></td><td class=\"address\">0x{:08x}</td></tr>".format(
+                anchor(csr.name), html.escape(csr.name), csr.address), file=stream)
+        print("</table>", file=stream)
+
+        for csr in region.csrs:
+            print("<h3 id=\"{}\">{}</h3>".format(anchor(csr.name), html.escape(csr.name)), file=stream)
+            print("<p class=\"address\">Address: 0x{:08x} + 0x{:x} = 0x{:08x}</p>".format(
+                region.origin, csr.address - region.origin, csr.address), file=stream)
+            print_text(stream, csr.description)
+            print(bitfield_svg(region, csr), file=stream)
+            if len(csr.fields) > 0:
+                print("<table>", file=stream)
+                print("<tr><th>Field</th><th>Name</th><th>Description</th></tr>", file=stream)
+                for f in csr.fields:
+                    print("<tr><td><code>{}</code></td><td>{}</td><td>".format(
+                        region.bit_range(f.offset, f.offset + f.size), html.escape(field_name(region, f, upper=True))), file=stream)
+                    print_text(stream, f.description)
+                    if note_pulses and f.pulse:
+                        print("<p>Writing a 1 to this bit triggers the function.</p>", file=stream)
+                    if f.values is not None:
+                        print(value_table(f.values), file=stream)
+                    print("</td></tr>", file=stream)
+                print("</table>", file=stream)
+
+    print_footer(stream)
+
+def print_module_html(module, stream, project_name):
+    """Print a complete HTML page for a :obj:`DocumentedModule`"""
+    if isinstance(module, DocumentedInterrupts):
+        print_header(stream, "Interrupt Controller", project_name)
+        print("<h1>Interrupt Controller</h1>", file=stream)
+        print_text(stream, """
+        This device has an ``EventManager``-based interrupt
+        system.  Individual modules generate `events` which are wired
+        into a central interrupt controller.
+
+        When an interrupt occurs, you should look the interrupt number up
+        in the CPU-specific interrupt table and then call the relevant
+        module.
+        """)
+        print("<h2>Assigned Interrupts</h2>", file=stream)
+        print("<p>The following interrupts are assigned on this system:</p>", file=stream)
+        print("<table>", file=stream)
+        print("<tr><th>Interrupt</th><th>Module</th></tr>", file=stream)
+        for module_name, irq_no in module.interrupts.items():
+            print("<tr><td>{}</td><td><a href=\"{}.html\">{}</a></td></tr>".format(
+                irq_no, html.escape(module_name), html.escape(module_name.upper())), file=stream)
+        print("</table>", file=stream)
+    else:
+        print_header(stream, module.name.upper(), project_name)
+        print("<h1>{}</h1>".format(html.escape(module.name.upper())), file=stream)
+        for section in module.sections:
+            print_section(stream, section)
+    print_footer(stream)
+
+def print_index_html(stream, project_name, additional_modules, region_names):
+    print_header(stream, "Index", project_name)
+    print("<h1>Documentation for {}</h1>".format(html.escape(project_name)), file=stream)
+    if len(additional_modules) > 0:
+        print("<h2>Modules</h2>", file=stream)
+        print("<ul>", file=stream)
+        for module in additional_modules:
+            print("<li><a href=\"{}.html\">{}</a></li>".format(html.escape(module.name), html.escape(module.name.upper())), file=stream)
+        print("</ul>", file=stream)
+    if len(region_names) > 0:
+        print("<h2>Register Groups</h2>", file=stream)
+        print("<ul>", file=stream)
+        for name in region_names:
+            print("<li><a href=\"{}.html\">{}</a></li>".format(html.escape(name), html.escape(name.upper())), file=stream)
+        print("</ul>", file=stream)
+    print_footer(stream)
+
+def generate_html_docs(soc, base_dir, project_name="LiteX SoC Project", quiet=False, note_pulses=False,
+            extra_regions=None, include=None, exclude=None):
+    """Render register reference pages straight to static HTML.
+
+    This produces one page per region and module, with inline SVG register
+    diagrams, without going through Sphinx.  Section bodies are shown as
+    plain text paragraphs, since there's no reStructuredText or Markdown
+    processing.
+
+    `include` and `exclude` select regions and modules by name, as for
+    :obj:`lxsocdoc.generate_docs`.
+    """
+    output = open_output(base_dir)
+
+    interrupts = select_interrupts(get_interrupts(soc), include, exclude)
+    seen_modules = set()
+
+    region_names = []
+    register_index = RegisterIndex()
+    regions = document_regions(soc, interrupts, seen_modules, include, exclude)
+    if extra_regions is not None:
+        regions = itertools.chain(regions, select_regions(extra_regions, include, exclude))
+    for region in regions:
+        region_names.append(region.name)
+        register_index.add_region(region)
+        with output.open(region.name + ".html") as outfile:
+            print_region_html(region, outfile, project_name, note_pulses)
+
+    additional_modules = document_modules(soc, interrupts, seen_modules, include, exclude)
+    for module in additional_modules:
+        with output.open(module.name + ".html") as outfile:
+            print_module_html(module, outfile, project_name)
+
+    with output.open("index.html") as index:
+        print_index_html(index, project_name, additional_modules, region_names)
+
+    with output.open("_static/style.css") as style:
+        style.write(stylesheet)
+    register_index.write(output)
+
+    if output is not base_dir:
+        output.close()
+
+    if not quiet and isinstance(output, DirectoryOutput):
+        print("Open {} to view the documentation".format(os.path.join(output.path, "index.html")))
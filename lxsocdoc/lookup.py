@@ -0,0 +1,175 @@
+import json
+
+lookup_page = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Register Lookup</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+input { font-family: monospace; font-size: 1.2em; width: 30em; }
+table { border-collapse: collapse; margin-top: 1em; }
+td, th { border: 1px solid #ccc; padding: 0.2em 0.6em; font-family: monospace; text-align: left; }
+</style>
+</head>
+<body>
+<h1>Register Lookup</h1>
+<p>Enter an address (e.g. <code>0xe0004818</code>) or a field name (e.g. <code>ready</code>).</p>
+<input id="query" type="text" autofocus>
+<div id="results"></div>
+<script src="register-index.js"></script>
+<script>
+
+// Return the position of the first entry whose key is greater than `key`
+function upperBound(entries, key, get) {
+    var lo = 0, hi = entries.length;
+    while (lo < hi) {
+        var mid = (lo + hi) >>> 1;
+        if (get(entries[mid]) <= key) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+// Return the position of the first entry whose key is not less than `key`
+function lowerBound(entries, key, get) {
+    var lo = 0, hi = entries.length;
+    while (lo < hi) {
+        var mid = (lo + hi) >>> 1;
+        if (get(entries[mid]) < key) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+function hex(n) {
+    return "0x" + ("00000000" + n.toString(16)).slice(-8);
+}
+
+function link(region, register) {
+    return "<a href=\\"../" + region + ".html#" + register.toLowerCase().replace(/_/g, "-") + "\\">" + register + "</a>";
+}
+
+function lookupAddress(address) {
+    var rows = [];
+    var i = upperBound(index.registers, address, function (r) { return r[0]; }) - 1;
+    if (i >= 0 && address < index.registers[i][1]) {
+        var r = index.registers[i];
+        rows.push([link(r[3], r[2]), hex(r[0]), r[3].toUpperCase()]);
+    } else {
+        var j = upperBound(index.regions, address, function (r) { return r[0]; }) - 1;
+        if (j >= 0 && address < index.regions[j][1]) {
+            var g = index.regions[j];
+            rows.push(["(unused)", hex(g[0]), g[2].toUpperCase()]);
+        }
+    }
+    return rows;
+}
+
+function lookupField(name) {
+    var rows = [];
+    var i = lowerBound(index.fields, name, function (f) { return f[0]; });
+    for (; i < index.fields.length && index.fields[i][0].lastIndexOf(name, 0) === 0; i++) {
+        var f = index.fields[i];
+        var r = index.registers[f[1]];
+        rows.push([f[0].toUpperCase() + " " + f[2], link(r[3], r[2]), hex(r[0])]);
+    }
+    return rows;
+}
+
+function render(headers, rows) {
+    if (rows.length === 0) {
+        return "<p>No matches.</p>";
+    }
+    var html = "<table><tr><th>" + headers.join("</th><th>") + "</th></tr>";
+    for (var i = 0; i < rows.length; i++) {
+        html += "<tr><td>" + rows[i].join("</td><td>") + "</td></tr>";
+    }
+    return html + "</table>";
+}
+
+function update() {
+    var query = document.getElementById("query").value.trim().toLowerCase();
+    var results = document.getElementById("results");
+    if (typeof index === "undefined" || query === "") {
+        results.innerHTML = "";
+    } else if (/^(0x[0-9a-f_]+|[0-9]+)$/.test(query)) {
+        results.innerHTML = render(["Register", "Address", "Region"], lookupAddress(parseInt(query.replace(/_/g, ""))));
+    } else {
+        results.innerHTML = render(["Field", "Register", "Address"], lookupField(query));
+    }
+}
+
+document.getElementById("query").addEventListener("input", update);
+update();
+</script>
+</body>
+</html>
+"""
+
+class RegisterIndex:
+    """A compact, sorted address-range and field-name index
+
+    Regions are added one at a time with :obj:`add_region`.  Once all regions
+    have been added, :obj:`write` emits ``_static/register-index.json`` along with a
+    static ``lookup.html`` page that binary-searches it.  The page loads the
+    same index from ``register-index.js`` with a ``<script>`` tag, since
+    browsers don't let pages opened from ``file://`` URLs fetch files.
+
+    The JSON file contains three sorted lists:
+
+    * ``regions``: ``[start, end, name]``, sorted by ``start``
+    * ``registers``: ``[start, end, register, region]``, sorted by ``start``
+    * ``fields``: ``[name, register index, bit range]``, sorted by ``name``
+    """
+
+    def __init__(self):
+        self.regions = []
+        self.registers = []
+        self.fields = []
+
+    def add_region(self, region):
+        end = region.origin
+        for csr in region.csrs:
+            register = len(self.registers)
+            self.registers.append([csr.address, csr.address + 4, csr.name, region.name])
+            end = max(end, csr.address + 4)
+            for f in csr.fields:
+                name = f.name
+                if hasattr(f, "start") and f.start is not None:
+                    name = "{}{}".format(f.name, region.bit_range(f.start, f.size + f.start))
+                self.fields.append([name.lower(), register, region.bit_range(f.offset, f.offset + f.size)])
+        # A memory is a single entry that covers its whole address range
+        for mem in region.memories:
+            self.registers.append([mem.address, mem.address + mem.size(), mem.name, region.name])
+            end = max(end, mem.address + mem.size())
+        self.regions.append([region.origin, end, region.name])
+
+    def index(self):
+        """Return the index as a dict, with every list sorted for lookup"""
+        order = sorted(range(len(self.registers)), key=lambda i: self.registers[i][0])
+        renumber = [0] * len(order)
+        for new, old in enumerate(order):
+            renumber[old] = new
+        registers = [self.registers[i] for i in order]
+        fields = sorted([[name, renumber[reg], bits] for (name, reg, bits) in self.fields])
+        return {
+            "regions": sorted(self.regions),
+            "registers": registers,
+            "fields": fields,
+        }
+
+    def write(self, output):
+        index = json.dumps(self.index(), separators=(",", ":"))
+        with output.open("_static/register-index.json") as out:
+            out.write(index)
+        with output.open("_static/register-index.js") as out:
+            out.write("var index = {};\n".format(index))
+        with output.open("_static/lookup.html") as out:
+            out.write(lookup_page)
@@ -40,6 +40,31 @@ def gather_submodules(module):
 
     return gather_submodules_inner(module, depth, seen_modules, submodules)
 
+class DocumentedSection:
+    """A plain-data copy of a :obj:`ModuleDoc` section
+
+    This provides the same ``title()``, ``body()``, ``format()`` and ``path()``
+    interface as :obj:`ModuleDoc`, but holds no reference to the live module,
+    so it can be pickled and sent to other processes.
+    """
+    def __init__(self, section):
+        self._title  = section.title()
+        self._body   = section.body()
+        self._format = section.format()
+        self._path   = section.path()
+
+    def title(self):
+        return self._title
+
+    def body(self):
+        return self._body
+
+    def format(self):
+        return self._format
+
+    def path(self):
+        return self._path
+
 class ModuleNotDocumented(Exception):
     """Indicates a Module has no documentation or sub-documentation"""
     pass
@@ -63,6 +88,12 @@ class DocumentedModule:
         if not has_documentation:
             raise ModuleNotDocumented()
 
+    def detach(self):
+        """Replace each section with a plain-data copy, so this module holds
+        no references to the live migen design."""
+        self.sections = [DocumentedSection(s) for s in self.sections]
+        return self
+
     def print_region(self, stream, base_dir, note_pulses=False):
         title = "{}".format(self.name.upper())
         print(title, file=stream)
@@ -85,6 +116,7 @@ class DocumentedInterrupts(DocumentedModule):
     """
     def __init__(self, interrupts):
         DocumentedModule.__init__(self, "interrupts", None, has_documentation=True)
+        self.interrupts = dict(interrupts)
 
         self.irq_table = [["Interrupt", "Module"]]
         for module_name, irq_no in interrupts.items():
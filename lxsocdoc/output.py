@@ -0,0 +1,224 @@
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+
+class Output:
+    """A destination for generated files
+
+    Files are created with ``open(name)``, where ``name`` is a
+    ``/``-separated path relative to the root of the output.  The same
+    paths are used regardless of whether the output is a directory
+    or an archive.
+    """
+    def open(self, name, only_if_changed=False):
+        """Return a text stream that creates ``name`` when it is closed.
+
+        By default, the contents are buffered and passed to
+        :obj:`write_bytes` once the stream is closed.  This lets a page
+        be written while a cache file it refers to is being written,
+        which archive formats don't allow for their members.
+
+        If ``only_if_changed`` is set, an existing file with identical
+        contents is left untouched, so its timestamp doesn't change."""
+        return BufferedMember(lambda text: self.write_bytes(name, text.encode("utf-8")))
+
+    def open_binary(self, name):
+        """Return a binary stream that creates ``name`` when it is closed"""
+        return BufferedBinaryMember(lambda data: self.write_bytes(name, data))
+
+    def copy(self, source, name):
+        """Copy the file at ``source`` byte-for-byte into ``name``"""
+        with open(source, "rb") as src:
+            data = src.read()
+        self.write_bytes(name, data)
+
+    def write_bytes(self, name, data):
+        raise NotImplementedError()
+
+    def subdir(self, prefix):
+        """Return an :obj:`Output` that places files under ``prefix``"""
+        return SubdirOutput(self, prefix)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class BufferedMember(io.StringIO):
+    """A text buffer that is handed to ``on_close`` once it is closed"""
+    def __init__(self, on_close):
+        io.StringIO.__init__(self)
+        self.on_close = on_close
+
+    def close(self):
+        if not self.closed:
+            self.on_close(self.getvalue())
+        io.StringIO.close(self)
+
+class BufferedBinaryMember(io.BytesIO):
+    """A binary buffer that is handed to ``on_close`` once it is closed"""
+    def __init__(self, on_close):
+        io.BytesIO.__init__(self)
+        self.on_close = on_close
+
+    def close(self):
+        if not self.closed:
+            self.on_close(self.getvalue())
+        io.BytesIO.close(self)
+
+class SubdirOutput(Output):
+    def __init__(self, parent, prefix):
+        self.parent = parent
+        self.prefix = prefix.strip("/") + "/"
+
+    def open(self, name, only_if_changed=False):
+        return self.parent.open(self.prefix + name, only_if_changed)
+
+    def open_binary(self, name):
+        return self.parent.open_binary(self.prefix + name)
+
+    def write_bytes(self, name, data):
+        self.parent.write_bytes(self.prefix + name, data)
+
+class DirectoryOutput(Output):
+    """Write files into a directory on disk"""
+    def __init__(self, path):
+        self.path = path
+        self.created_dirs = set()
+
+    def make_parent(self, name):
+        parent = os.path.dirname(os.path.join(self.path, name))
+        if parent not in self.created_dirs:
+            os.makedirs(parent, exist_ok=True)
+            self.created_dirs.add(parent)
+
+    def open(self, name, only_if_changed=False):
+        self.make_parent(name)
+        if only_if_changed:
+            return BufferedMember(lambda text: self.write_if_changed(name, text.encode("utf-8")))
+        return open(os.path.join(self.path, name), "w", encoding="utf-8")
+
+    def open_binary(self, name):
+        self.make_parent(name)
+        return open(os.path.join(self.path, name), "wb")
+
+    def write_if_changed(self, name, data):
+        path = os.path.join(self.path, name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return
+        self.write_bytes(name, data)
+
+    def copy(self, source, name):
+        self.make_parent(name)
+        shutil.copyfile(source, os.path.join(self.path, name))
+
+    def write_bytes(self, name, data):
+        self.make_parent(name)
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(data)
+
+class MemoryOutput(Output):
+    """Keep files in memory, as text in the ``files`` dict"""
+    def __init__(self):
+        self.files = {}
+
+    def open(self, name, only_if_changed=False):
+        return BufferedMember(lambda text: self.files.__setitem__(name, text))
+
+    def write_bytes(self, name, data):
+        self.files[name] = data.decode("utf-8")
+
+def archive_mtime():
+    """Timestamp for archive members.  Honors ``SOURCE_DATE_EPOCH``, so
+    identical inputs produce identical archives."""
+    if "SOURCE_DATE_EPOCH" in os.environ:
+        return int(os.environ["SOURCE_DATE_EPOCH"])
+    return int(time.time())
+
+class ZipOutput(Output):
+    """Stream files into a zip archive.  ``path`` may be a filename or a
+    writable binary file object, which need not be seekable.
+
+    Each file is appended to the archive as soon as it is closed, so only
+    the files that are currently open are held in memory."""
+    def __init__(self, path):
+        self.zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        # Zip timestamps can't predate 1980
+        self.date_time = time.gmtime(max(archive_mtime(), 315532800))[:6]
+
+    def member(self, name):
+        info = zipfile.ZipInfo(name, self.date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        return info
+
+    def write_bytes(self, name, data):
+        self.zip.writestr(self.member(name), data)
+
+    def close(self):
+        self.zip.close()
+
+class TarOutput(Output):
+    """Stream files into a tar archive, compressed with gzip if ``compression``
+    is ``"gz"``.  ``path`` may be a filename or a writable binary file object,
+    which need not be seekable."""
+    def __init__(self, path, compression=""):
+        self.mtime = archive_mtime()
+        if isinstance(path, str):
+            self.file = open(path, "wb")
+            self.owns_file = True
+        else:
+            self.file = path
+            self.owns_file = False
+        # Compress separately, so the gzip header carries our timestamp
+        # rather than the current time.
+        self.gzip = None
+        fileobj = self.file
+        if compression == "gz":
+            self.gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self.file, mtime=self.mtime)
+            fileobj = self.gzip
+        elif compression != "":
+            raise ValueError("Unsupported tar compression: {}".format(compression))
+        self.tar = tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def write_bytes(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = self.mtime
+        info.mode = 0o644
+        self.tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.tar.close()
+        if self.gzip is not None:
+            self.gzip.close()
+        if self.owns_file:
+            self.file.close()
+
+def open_output(path):
+    """Return an :obj:`Output` for ``path``.
+
+    Paths ending in ``.zip``, ``.tar``, ``.tar.gz`` or ``.tgz`` are written
+    as archives, and anything else is treated as a directory.  ``path`` may
+    be a string or an :obj:`os.PathLike`.  If ``path`` is already an
+    :obj:`Output`, it is returned as-is."""
+    if isinstance(path, Output):
+        return path
+    path = os.fspath(path)
+    if path.endswith(".zip"):
+        return ZipOutput(path)
+    if path.endswith(".tar.gz") or path.endswith(".tgz"):
+        return TarOutput(path, "gz")
+    if path.endswith(".tar"):
+        return TarOutput(path)
+    return DirectoryOutput(path)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""Compact binary register database
+
+The database lets bus tracers and debuggers turn an address into a register
+and field names without parsing the SVD file.  It is designed to be used
+through ``mmap``: every table has fixed-width entries, so a lookup reads
+only the entries it needs, straight out of the mapped file.
+
+All integers are little-endian.  The file consists of:
+
+* A header (``header_format``): the magic ``LXREGDB\\0``, the format
+  version, and the count and file offset of each table, followed by the
+  offset and size of the string pool.
+
+* The address table: one ``entry_format`` entry per register or memory,
+  sorted by start address.  Each entry holds the start and (exclusive)
+  end address, the string pool offsets of its name and region name, the
+  index of its first field, its number of fields, flags, and for memories
+  the number of bytes taken by each memory entry.
+
+* The field table: one ``field_format`` entry per field, holding the
+  string pool offset of its name, its reset value, bit offset and size.
+  The fields of a register are contiguous.
+
+* The string pool: NUL-terminated UTF-8 strings, each stored only once.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+
+from . import get_interrupts, select_interrupts, select_regions, document_regions
+from .output import open_output
+
+magic = b"LXREGDB\0"
+version = 1
+
+# magic, version, entry count, entry offset, field count, field offset,
+# string pool offset, string pool size
+header_format = struct.Struct("<8sIIIIIII")
+# start, end, name, region, first field, field count, flags, stride
+entry_format = struct.Struct("<IIIIIHHI")
+# name, reset value, bit offset, bit size
+field_format = struct.Struct("<IIBBxx")
+
+# Set in the flags of an entry that describes a memory
+flag_memory = 1
+
+class StringPool:
+    """Collect NUL-terminated strings, storing each one only once"""
+    def __init__(self):
+        self.offsets = {}
+        self.data = bytearray()
+
+    def add(self, s):
+        if s not in self.offsets:
+            self.offsets[s] = len(self.data)
+            self.data += s.encode("utf-8") + b"\0"
+        return self.offsets[s]
+
+class RegisterDatabaseWriter:
+    """Build a register database from :obj:`DocumentedCSRRegion` objects
+
+    Regions are added one at a time with :obj:`add_region`, and only the
+    packed tables are kept.  :obj:`write` sorts the address table and
+    writes the database to a binary stream."""
+    def __init__(self):
+        self.strings = StringPool()
+        self.entries = []
+        self.fields = bytearray()
+        self.field_count = 0
+
+    def add_entry(self, start, end, name, region, field_count, flags=0, stride=0):
+        if start < 0 or end > 2**32:
+            raise ValueError("{}: address 0x{:x} does not fit in 32 bits".format(name, end))
+        self.entries.append((start, end, self.strings.add(name), self.strings.add(region),
+                             self.field_count - field_count, field_count, flags, stride))
+
+    def add_region(self, region):
+        for csr in region.csrs:
+            for f in csr.fields:
+                name = f.name
+                reset = f.reset_value
+                if getattr(f, "start", None) is not None:
+                    name = "{}{}".format(f.name, region.bit_range(f.start, f.size + f.start))
+                    # The reset value of a split field is that of the whole
+                    # field, so only keep the bits in this part of it.
+                    reset = (f.reset_value >> f.start) & ((1 << f.size) - 1)
+                self.fields += field_format.pack(self.strings.add(name.lower()), reset, f.offset, f.size)
+                self.field_count += 1
+            self.add_entry(csr.address, csr.address + 4, csr.name, region.name, len(csr.fields))
+        for mem in region.memories:
+            self.add_entry(mem.address, mem.address + mem.size(), mem.name, region.name, 0,
+                           flag_memory, mem.stride())
+
+    def write(self, stream):
+        self.entries.sort(key=lambda e: (e[0], e[1]))
+        entries_offset = header_format.size
+        fields_offset = entries_offset + len(self.entries) * entry_format.size
+        strings_offset = fields_offset + len(self.fields)
+        stream.write(header_format.pack(magic, version, len(self.entries), entries_offset,
+                                        self.field_count, fields_offset,
+                                        strings_offset, len(self.strings.data)))
+        for entry in self.entries:
+            stream.write(entry_format.pack(*entry))
+        stream.write(self.fields)
+        stream.write(self.strings.data)
+
+def generate_regdb(soc, buildpath, name="soc", filename=None, include=None, exclude=None, extra_regions=None):
+    """Generate a register database.  `buildpath` may be a directory, an
+    archive path or an :obj:`Output`, as for :obj:`lxsocdoc.generate_svd`.
+    The file is called `<name>.regdb` unless `filename` is specified."""
+    interrupts = select_interrupts(get_interrupts(soc), include, exclude)
+    if filename is None:
+        filename = name + ".regdb"
+
+    writer = RegisterDatabaseWriter()
+    for region in document_regions(soc, interrupts, set(), include, exclude):
+        writer.add_region(region)
+    if extra_regions is not None:
+        for region in select_regions(extra_regions, include, exclude):
+            writer.add_region(region)
+
+    output = open_output(buildpath)
+    with output.open_binary(filename) as regdb:
+        writer.write(regdb)
+    if output is not buildpath:
+        output.close()
+
+class RegisterField:
+    def __init__(self, name, reset_value, offset, size):
+        self.name        = name
+        self.reset_value = reset_value
+        self.offset      = offset
+        self.size        = size
+
+    def extract(self, value):
+        """Return the bits of register value `value` that belong to this field"""
+        return (value >> self.offset) & ((1 << self.size) - 1)
+
+class RegisterEntry:
+    """A register or memory found in a :obj:`RegisterDatabase`
+
+    For a memory, `index` is the number of the memory entry that holds the
+    address that was looked up."""
+    def __init__(self, name, region, start, end, fields, is_memory=False, index=None):
+        self.name      = name
+        self.region    = region
+        self.start     = start
+        self.end       = end
+        self.fields    = fields
+        self.is_memory = is_memory
+        self.index     = index
+
+    def decode(self, value):
+        """Return a list of `(field name, field value)` pairs for a value
+        read from or written to this register"""
+        return [(f.name, f.extract(value)) for f in self.fields]
+
+class EntryStarts:
+    """A read-only sequence view of the start addresses in the address
+    table, which lets :obj:`bisect` search the mapped file directly"""
+    def __init__(self, db):
+        self.db = db
+
+    def __len__(self):
+        return self.db.entry_count
+
+    def __getitem__(self, i):
+        return struct.unpack_from("<I", self.db.data, self.db.entries_offset + i * entry_format.size)[0]
+
+class RegisterDatabase:
+    """Read a register database written by :obj:`generate_regdb`
+
+    ``source`` is a filename or :obj:`os.PathLike`, which is mapped into
+    memory, or a bytes-like object.  Nothing is read up front: each lookup
+    binary-searches the address table in place, in O(log n), and only
+    decodes the entry it finds.  Use it as a context manager, or call
+    :obj:`close`, to unmap the file::
+
+        with RegisterDatabase("build/software/soc.regdb") as db:
+            reg = db.lookup(0xe0000804)
+            print(reg.name, reg.decode(0x12))
+    """
+    def __init__(self, source):
+        self.mmap = None
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = self.mmap
+        else:
+            self.data = source
+
+        (file_magic, file_version, self.entry_count, self.entries_offset, self.field_count,
+            self.fields_offset, self.strings_offset, self.strings_size) = header_format.unpack_from(self.data, 0)
+        if file_magic != magic:
+            raise ValueError("Not a register database")
+        if file_version != version:
+            raise ValueError("Unsupported register database version {}".format(file_version))
+        self.starts = EntryStarts(self)
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.entry_count
+
+    def string(self, offset):
+        start = self.strings_offset + offset
+        end = self.data.find(b"\0", start)
+        return bytes(self.data[start:end]).decode("utf-8")
+
+    def field(self, i):
+        (name, reset_value, offset, size) = field_format.unpack_from(self.data, self.fields_offset + i * field_format.size)
+        return RegisterField(self.string(name), reset_value, offset, size)
+
+    def entry(self, i, address=None):
+        """Decode entry `i` of the address table"""
+        (start, end, name, region, first_field, field_count, flags, stride) = entry_format.unpack_from(
+            self.data, self.entries_offset + i * entry_format.size)
+        fields = [self.field(first_field + n) for n in range(field_count)]
+        is_memory = (flags & flag_memory) != 0
+        index = None
+        if is_memory and address is not None and stride > 0:
+            index = (address - start) // stride
+        return RegisterEntry(self.string(name), self.string(region), start, end, fields, is_memory, index)
+
+    def lookup(self, address):
+        """Return the :obj:`RegisterEntry` that contains `address`, or None"""
+        i = bisect.bisect_right(self.starts, address) - 1
+        # Entries are sorted by start address, so only the entries that
+        # start at the same address as entry `i` can contain `address`.
+        while i >= 0:
+            (start, end) = struct.unpack_from("<II", self.data, self.entries_offset + i * entry_format.size)
+            if address < end:
+                return self.entry(i, address)
+            if i == 0 or self.starts[i - 1] != start:
+                break
+            i -= 1
+        return None
+
+    def entries(self):
+        """Iterate over every entry, in address order"""
+        for i in range(self.entry_count):
+            yield self.entry(i)
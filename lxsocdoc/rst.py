@@ -3,6 +3,8 @@ import textwrap
 def make_table(t):
     """Make a reStructured Text Table
 
+    The first row of `t` is the table header.  `t` is not modified.
+
     Returns
     -------
 
@@ -23,7 +25,7 @@ def make_table(t):
             column_widths[i] = max(column_widths[i], len(column))
 
     # Print out header
-    header = t.pop(0)
+    header = t[0]
     table += "+"
     for i, column in enumerate(header):
         table += "-" + "-"*column_widths[i]
@@ -41,7 +43,7 @@ def make_table(t):
         table += "=+"
     table += "\n"
 
-    for row in t:
+    for row in t[1:]:
         table += "|"
         for i, column in enumerate(row):
             table += " " + column.ljust(column_widths[i]) + " |"
@@ -64,6 +66,7 @@ def print_table(table, stream):
 
     table (:obj:`list` of :obj:`list`s): A list of rows in the table.
     Each row has several columns.  The first row is the table header.
+    The table is not modified.
 
     stream (:obj:`io`): Destination output file.
     """
@@ -82,7 +85,7 @@ def print_table(table, stream):
             column_widths[i] = max(column_widths[i], len(column))
 
     # Print out header
-    header = table.pop(0)
+    header = table[0]
     print("+", file=stream, end="")
     for i, column in enumerate(header):
         print("-" + "-"*column_widths[i], file=stream, end="")
@@ -100,7 +103,7 @@ def print_table(table, stream):
         print("=+", file=stream, end="")
     print("", file=stream)
 
-    for row in table:
+    for row in table[1:]:
         print("|", file=stream, end="")
         for i, column in enumerate(row):
             print(" " + column.ljust(column_widths[i]) + " |", file=stream, end="")
@@ -0,0 +1,117 @@
+"""Sphinx extension that renders register pages on demand
+
+Add ``lxsocdoc.sphinxext`` to the ``sphinx_extensions`` argument of
+:obj:`lxsocdoc.generate_docs`.  Instead of rendering every region page up
+front, ``generate_docs`` then writes the detached register model to
+``lxsocdoc-model.pickle`` next to ``conf.py``, along with a one-line
+placeholder ``<region>.rst`` for each region.
+
+During the build, this extension fills in each placeholder from the model
+as Sphinx reads it.  A fingerprint of each region is kept in the Sphinx
+environment, so on incremental builds only the pages of regions whose
+data changed are read and written again.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+
+model_filename = "lxsocdoc-model.pickle"
+model_version = 1
+
+stub_text = ".. This page is generated by lxsocdoc.sphinxext from {}\n"
+
+class RegionModelWriter:
+    """Write detached regions to a model file, one at a time
+
+    The model is a sequence of pickles: a header, followed by one
+    `(name, fingerprint, region)` tuple per region."""
+    def __init__(self, stream):
+        self.stream = stream
+        pickle.dump({"version": model_version}, self.stream, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def add_region(self, region):
+        data = pickle.dumps(region, protocol=pickle.HIGHEST_PROTOCOL)
+        fingerprint = hashlib.sha256(data).hexdigest()
+        pickle.dump((region.name, fingerprint, data), self.stream, protocol=pickle.HIGHEST_PROTOCOL)
+
+def read_region_model(path):
+    """Read a model file written by :obj:`RegionModelWriter`.
+
+    Returns a dict mapping each region name to `(fingerprint, data)`,
+    where `data` is the pickled region.  Regions are only unpickled when
+    their page is actually read."""
+    regions = {}
+    with open(path, "rb") as stream:
+        header = pickle.load(stream)
+        if header.get("version") != model_version:
+            raise ValueError("{}: unsupported lxsocdoc model version {}".format(path, header.get("version")))
+        while True:
+            try:
+                (name, fingerprint, data) = pickle.load(stream)
+            except EOFError:
+                break
+            regions[name] = (fingerprint, data)
+    return regions
+
+def print_stub(stream):
+    print(stub_text.format(model_filename), file=stream, end="")
+
+def load_model(app):
+    path = os.path.join(app.srcdir, app.config.lxsocdoc_model)
+    app.lxsocdoc_regions = {}
+    if os.path.exists(path):
+        app.lxsocdoc_regions = read_region_model(path)
+    if not hasattr(app.env, "lxsocdoc_fingerprints"):
+        app.env.lxsocdoc_fingerprints = {}
+
+def get_outdated(app, env, added, changed, removed):
+    """Re-read the pages of regions whose data changed since the last build"""
+    fingerprints = getattr(env, "lxsocdoc_fingerprints", {})
+    outdated = []
+    for (name, (fingerprint, data)) in sorted(app.lxsocdoc_regions.items()):
+        if name in added or name in changed or name not in env.found_docs:
+            continue
+        if fingerprints.get(name) != fingerprint:
+            outdated.append(name)
+    return outdated
+
+def render_region(app, docname, source):
+    if docname not in app.lxsocdoc_regions:
+        return
+    (fingerprint, data) = app.lxsocdoc_regions[docname]
+    region = pickle.loads(data)
+    page = io.StringIO()
+    region.print_region(page, os.fspath(app.srcdir), app.config.lxsocdoc_note_pulses)
+    source[0] = page.getvalue()
+    if not hasattr(app.env, "lxsocdoc_fingerprints"):
+        app.env.lxsocdoc_fingerprints = {}
+    app.env.lxsocdoc_fingerprints[docname] = fingerprint
+
+def purge_doc(app, env, docname):
+    if hasattr(env, "lxsocdoc_fingerprints"):
+        env.lxsocdoc_fingerprints.pop(docname, None)
+
+def merge_info(app, env, docnames, other):
+    """Collect the fingerprints recorded by parallel readers"""
+    if not hasattr(env, "lxsocdoc_fingerprints"):
+        env.lxsocdoc_fingerprints = {}
+    other_fingerprints = getattr(other, "lxsocdoc_fingerprints", {})
+    for docname in docnames:
+        if docname in other_fingerprints:
+            env.lxsocdoc_fingerprints[docname] = other_fingerprints[docname]
+
+def setup(app):
+    app.add_config_value("lxsocdoc_model", model_filename, "env")
+    app.add_config_value("lxsocdoc_note_pulses", False, "env")
+    app.connect("builder-inited", load_model)
+    app.connect("env-get-outdated", get_outdated)
+    app.connect("source-read", render_region)
+    app.connect("env-purge-doc", purge_doc)
+    app.connect("env-merge-info", merge_info)
+    return {
+        "version": "1",
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -0,0 +1,282 @@
+import os
+import types
+import xml.etree.ElementTree as ElementTree
+
+from .csr import DocumentedCSRRegion, DocumentedCSR, DocumentedCSRField, DocumentedMemory
+
+def svd_int(text, default=0):
+    """Parse an SVD scaledNonNegativeInteger, such as `0x1F`, `#0101` or `42`"""
+    if text is None:
+        return default
+    text = text.strip().lower()
+    if text.startswith("0x"):
+        return int(text[2:], 16)
+    if text.startswith("#"):
+        # Binary, possibly with `x` for "don't care" bits
+        return int(text[1:].replace("x", "0"), 2)
+    if text.startswith("0b"):
+        return int(text[2:].replace("x", "0"), 2)
+    return int(text)
+
+def child_text(element, tag, default=None):
+    child = element.find(tag)
+    if child is None or child.text is None:
+        return default
+    return child.text.strip()
+
+def field_bits(field):
+    """Return `(offset, size)` of an SVD field, which may be given in any of
+    the three formats the SVD specification allows."""
+    if field.find("bitOffset") is not None:
+        return (svd_int(child_text(field, "bitOffset")), svd_int(child_text(field, "bitWidth"), 1))
+    if field.find("lsb") is not None:
+        lsb = svd_int(child_text(field, "lsb"))
+        msb = svd_int(child_text(field, "msb"))
+        return (lsb, msb - lsb + 1)
+    bit_range = child_text(field, "bitRange")
+    if bit_range is not None:
+        (msb, lsb) = bit_range.strip("[]").split(":")
+        return (svd_int(lsb), svd_int(msb) - svd_int(lsb) + 1)
+    raise ValueError("SVD field {} has no bit position".format(child_text(field, "name")))
+
+def field_values(field):
+    """Convert `<enumeratedValues>` into a CSRField-style list of values"""
+    values = []
+    for enum in field.iter("enumeratedValue"):
+        name = child_text(enum, "name", "")
+        description = child_text(enum, "description", name)
+        value = child_text(enum, "value")
+        if value is None:
+            # `isDefault` entries cover every other value
+            value = "other"
+        values.append((value, name, description))
+    if len(values) == 0:
+        return None
+    return values
+
+def expand_dim(element, name):
+    """Return a list of `(name, offset)` pairs for an element that may be
+    an SVD `dim` array"""
+    dim = child_text(element, "dim")
+    if dim is None:
+        return [(name, 0)]
+    count = svd_int(dim)
+    increment = svd_int(child_text(element, "dimIncrement"))
+    index = child_text(element, "dimIndex")
+    if index is not None and "," in index:
+        indices = [i.strip() for i in index.split(",")]
+    elif index is not None and "-" in index:
+        (first, last) = index.split("-")
+        indices = [str(i) for i in range(int(first), int(last) + 1)]
+    else:
+        indices = [str(i) for i in range(count)]
+    return [(name.replace("[%s]", i).replace("%s", i), n * increment) for (n, i) in enumerate(indices)]
+
+class SVDRegisterDefaults:
+    """The register properties that SVD lets each level inherit from the
+    level above"""
+    def __init__(self, element, parent=None):
+        self.size = 32
+        self.reset_value = 0
+        if parent is not None:
+            self.size = parent.size
+            self.reset_value = parent.reset_value
+        if element is not None:
+            self.size = svd_int(child_text(element, "size"), self.size)
+            self.reset_value = svd_int(child_text(element, "resetValue"), self.reset_value)
+
+def is_memory_array(register, fields):
+    """A register array of consecutive words with a single `data` field
+    starting at bit 0, which is how memories are exported by
+    :obj:`lxsocdoc.generate_svd`.  Other register arrays are expanded."""
+    name = child_text(register, "name")
+    return (child_text(register, "dim") is not None and name.endswith("[%s]")
+            and svd_int(child_text(register, "dimIncrement")) == 4
+            and len(fields) == 1 and fields[0].name == "data" and fields[0].offset == 0)
+
+def import_registers(region, element, base_offset, defaults, prefix=""):
+    """Append a DocumentedCSR to `region` for every register in `element`,
+    descending into `<cluster>` elements"""
+    for child in element:
+        if child.tag == "cluster":
+            cluster_defaults = SVDRegisterDefaults(child, defaults)
+            cluster_offset = base_offset + svd_int(child_text(child, "addressOffset"))
+            for (name, offset) in expand_dim(child, child_text(child, "name")):
+                import_registers(region, child, cluster_offset + offset, cluster_defaults, prefix + name + "_")
+        elif child.tag == "register":
+            register_defaults = SVDRegisterDefaults(child, defaults)
+            register_offset = base_offset + svd_int(child_text(child, "addressOffset"))
+            fields = []
+            for f in child.iter("field"):
+                (offset, size) = field_bits(f)
+                fields.append(DocumentedCSRField(types.SimpleNamespace(
+                    name=child_text(f, "name").lower(),
+                    size=size,
+                    offset=offset,
+                    reset_value=(register_defaults.reset_value >> offset) & ((1 << size) - 1),
+                    description=child_text(f, "description"),
+                    access=child_text(f, "access"),
+                    pulse=False,
+                    values=field_values(f),
+                )))
+            fields.sort(key=lambda f: f.offset)
+            if is_memory_array(child, fields):
+                # Keep word-addressed arrays, such as the memories we
+                # export, as one address range instead of one register
+                # per word.
+                width = fields[0].size
+                name = (prefix + child_text(child, "name").replace("[%s]", "")).upper()
+                # Memories exported by lxsocdoc already carry the region name
+                if name != region.name.upper() and not name.startswith(region.name.upper() + "_"):
+                    name = region.name.upper() + "_" + name
+                region.memories.append(DocumentedMemory(
+                    name, region.origin + register_offset, svd_int(child_text(child, "dim")), width, width,
+                    child_text(child, "access") == "read-only", child_text(child, "description"),
+                ))
+                continue
+            for (name, offset) in expand_dim(child, child_text(child, "name")):
+                name = (prefix + name).upper()
+                register_fields = fields
+                if len(register_fields) == 0:
+                    # Describe registers without fields as one field spanning the register
+                    register_fields = [DocumentedCSRField(types.SimpleNamespace(
+                        name=name.lower(), size=register_defaults.size, offset=0,
+                        reset_value=register_defaults.reset_value, description=None,
+                        access=None, pulse=False, values=None,
+                    ))]
+                region.csrs.append(DocumentedCSR(
+                    region.name.upper() + "_" + name, region.origin + register_offset + offset,
+                    short_numbered_name=name, short_name=name, reset=register_defaults.reset_value,
+                    size=register_defaults.size, description=child_text(child, "description"),
+                    fields=[DocumentedCSRField(f) for f in register_fields],
+                ))
+
+def derived_peripherals(source):
+    """Return the lower-case names of the peripherals that other peripherals
+    are `derivedFrom`.  This is a cheap pass over the file, which releases
+    each peripheral's XML as soon as it has been read."""
+    names = set()
+    parent = None
+    depth = 0
+    for (event, element) in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2 and element.tag == "peripherals":
+                parent = element
+            elif depth == 3 and element.tag == "peripheral" and element.get("derivedFrom") is not None:
+                names.add(element.get("derivedFrom").lower())
+            continue
+        depth -= 1
+        if element.tag == "peripheral" and depth == 2:
+            parent.remove(element)
+    return names
+
+def import_svd(source):
+    """Import the peripherals of an SVD file as :obj:`DocumentedCSRRegion` objects
+
+    ``source`` is a filename, an :obj:`os.PathLike` or a binary file
+    object.  The file is read incrementally, and each peripheral is
+    converted and released as soon as its closing tag has been read, so
+    only one peripheral's worth of XML is ever held in memory.
+
+    To resolve ``derivedFrom``, the converted regions of the peripherals
+    that others derive from are kept until the end of the file.  They are
+    found by a quick first pass over the file, so ``source`` is read twice.
+    If ``source`` is a file object that can't seek, that pass is skipped
+    and every converted region is kept instead.
+
+    This is a generator, which yields one detached region per peripheral.
+    The regions may be rendered with ``print_region()`` like any other,
+    or passed to :obj:`generate_docs` via its ``extra_regions`` argument.
+    Peripherals that are ``derivedFrom`` an earlier peripheral share its
+    registers, relocated to their own base address.
+    """
+    root = None
+    peripherals = None
+    device_defaults = None
+    imported = {}
+    depth = 0
+
+    # Find out which peripherals need to be kept for `derivedFrom`
+    referenced = None
+    if isinstance(source, (str, os.PathLike)):
+        referenced = derived_peripherals(source)
+    elif source.seekable():
+        start = source.tell()
+        referenced = derived_peripherals(source)
+        source.seek(start)
+
+    for (event, element) in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 1:
+                root = element
+            elif depth == 2 and element.tag == "peripherals":
+                peripherals = element
+            continue
+        depth -= 1
+        if element.tag != "peripheral" or depth != 2:
+            continue
+
+        # Device-level register properties precede the peripherals
+        if device_defaults is None:
+            device_defaults = SVDRegisterDefaults(root)
+        name = child_text(element, "name").lower()
+        origin = svd_int(child_text(element, "baseAddress"))
+        peripheral_defaults = SVDRegisterDefaults(element, device_defaults)
+        region = DocumentedCSRRegion((name, origin, peripheral_defaults.size, []))
+
+        derived_from = element.get("derivedFrom")
+        registers = element.find("registers")
+        if registers is not None:
+            import_registers(region, registers, 0, peripheral_defaults)
+        elif derived_from is not None and derived_from.lower() in imported:
+            base = imported[derived_from.lower()]
+            for csr in base.csrs:
+                short_name = csr.short_numbered_name
+                region.csrs.append(DocumentedCSR(
+                    name.upper() + "_" + short_name, origin + csr.address - base.origin,
+                    short_numbered_name=short_name, short_name=csr.short_name, reset=csr.reset_value,
+                    size=csr.size, description=csr.description,
+                    fields=[DocumentedCSRField(f) for f in csr.fields],
+                ))
+            for mem in base.memories:
+                # Memory names carry the region name, like the CSR names
+                mem_name = mem.name
+                if mem_name == base.name.upper():
+                    mem_name = name.upper()
+                elif mem_name.startswith(base.name.upper() + "_"):
+                    mem_name = name.upper() + mem_name[len(base.name):]
+                region.memories.append(DocumentedMemory(
+                    mem_name, origin + mem.address - base.origin, mem.depth, mem.width, mem.busword,
+                    mem.access == "read-only", mem.description,
+                ))
+
+        description = child_text(element, "description")
+        if description is not None:
+            region.sections.append(SVDSection("Overview", description))
+        region.csrs.sort(key=lambda csr: csr.address)
+        if referenced is None or name in referenced:
+            imported[name] = region
+
+        # Release the parsed XML for this peripheral before moving on
+        peripherals.remove(element)
+        yield region.detach()
+
+class SVDSection:
+    """A documentation section taken from an SVD `<description>`"""
+    def __init__(self, title, body):
+        self._title = title
+        self._body = body
+
+    def title(self):
+        return self._title
+
+    def body(self):
+        return self._body
+
+    def format(self):
+        return "rst"
+
+    def path(self):
+        return None
@@ -0,0 +1,194 @@
+class Diagnostic:
+    """A single problem found in a register map
+
+    Attributes
+    ----------
+
+    severity (:obj:`str`): Either ``"error"`` or ``"warning"``.
+
+    code (:obj:`str`): A short, stable identifier for the kind of problem,
+    such as ``"region-overlap"``.
+
+    message (:obj:`str`): A human-readable description of the problem.
+
+    region, register, field (:obj:`str`): Where the problem was found, if known.
+    """
+    def __init__(self, severity, code, message, region=None, register=None, field=None):
+        self.severity = severity
+        self.code     = code
+        self.message  = message
+        self.region   = region
+        self.register = register
+        self.field    = field
+
+    def as_dict(self):
+        return {
+            "severity": self.severity,
+            "code":     self.code,
+            "message":  self.message,
+            "region":   self.region,
+            "register": self.register,
+            "field":    self.field,
+        }
+
+    def __str__(self):
+        location = ".".join([x for x in [self.region, self.register, self.field] if x is not None])
+        return "{}: {}: [{}] {}".format(self.severity, location, self.code, self.message)
+
+def region_extent(region):
+    """Return the `(start, end)` address range occupied by a region"""
+    end = region.origin
+    for csr in region.csrs:
+        end = max(end, csr.address + 4)
+    for mem in region.memories:
+        end = max(end, mem.address + mem.size())
+    return (region.origin, end)
+
+def is_sub_csr(csr):
+    """A DocumentedCSR that is one part of a CSR wider than the bus"""
+    return csr.short_numbered_name != csr.short_name
+
+def field_reset(f):
+    """Return the reset value of a field, as it appears in its register.
+    A field that was split across sub-CSRs carries the reset value of the
+    whole field, so only the bits of this part of it are returned."""
+    if getattr(f, "start", None) is not None:
+        return (f.reset_value >> f.start) & ((1 << f.size) - 1)
+    return f.reset_value
+
+def find_overlaps(intervals):
+    """Given a list of `(start, end, item)` intervals, return a list of
+    `(item, other)` pairs where `item` starts before `other` ends.
+
+    The intervals are sorted once, and then swept in a single pass while
+    remembering the interval that reaches furthest, so this runs in
+    O(n log n).  Each overlapping interval is reported once, against
+    the earlier interval it collides with."""
+    overlaps = []
+    reach = None
+    for (start, end, item) in sorted(intervals, key=lambda i: (i[0], i[1])):
+        if start == end:
+            continue
+        if reach is not None and start < reach[0]:
+            overlaps.append((item, reach[1]))
+        if reach is None or end > reach[0]:
+            reach = (end, item)
+    return overlaps
+
+def validate_register(region, csr, diagnostics):
+    if is_sub_csr(csr):
+        width = region.busword
+    else:
+        width = csr.size
+
+    if csr.reset_value < 0 or csr.reset_value >= 2**width:
+        diagnostics.append(Diagnostic("error", "reset-overflow",
+            "reset value 0x{:x} does not fit in {} bits".format(csr.reset_value, width),
+            region.name, csr.name))
+
+    intervals = []
+    fields_mask = 0
+    fields_reset = 0
+    for f in csr.fields:
+        if f.size <= 0:
+            diagnostics.append(Diagnostic("error", "field-empty",
+                "field has a size of {} bits".format(f.size),
+                region.name, csr.name, f.name))
+            continue
+        if f.offset < 0 or f.offset + f.size > width:
+            diagnostics.append(Diagnostic("error", "field-overflow",
+                "field occupies bits [{}:{}], which do not fit in a {}-bit register".format(f.offset + f.size - 1, f.offset, width),
+                region.name, csr.name, f.name))
+        reset = field_reset(f)
+        if reset < 0 or reset >= 2**f.size:
+            diagnostics.append(Diagnostic("error", "reset-overflow",
+                "reset value 0x{:x} does not fit in {} bits".format(reset, f.size),
+                region.name, csr.name, f.name))
+        else:
+            fields_mask |= ((1 << f.size) - 1) << f.offset
+            fields_reset |= reset << f.offset
+        intervals.append((f.offset, f.offset + f.size, f))
+
+    # The register's reset value must agree with its fields.  Bits that no
+    # field covers are not checked.
+    if csr.reset_value & fields_mask != fields_reset:
+        diagnostics.append(Diagnostic("error", "reset-mismatch",
+            "reset value 0x{:x} does not match the reset value 0x{:x} of its fields".format(
+                csr.reset_value & fields_mask, fields_reset),
+            region.name, csr.name))
+
+    for (f, other) in find_overlaps(intervals):
+        diagnostics.append(Diagnostic("error", "field-overlap",
+            "field overlaps field `{}`".format(other.name),
+            region.name, csr.name, f.name))
+
+def validate_regions(regions):
+    """Check a register map for consistency
+
+    ``regions`` is an iterable of :obj:`DocumentedCSRRegion`, such as the
+    ``regions`` of a :obj:`DocumentedSoC`.  Each region is checked as it
+    is read, and only its address range is kept for the final check for
+    overlapping regions.
+
+    Returns a list of :obj:`Diagnostic` objects, which is empty if no
+    problems were found.
+    """
+    diagnostics = []
+    region_intervals = []
+
+    for region in regions:
+        (start, end) = region_extent(region)
+        region_intervals.append((start, end, region.name))
+
+        intervals = []
+        previous = None
+        for csr in region.csrs:
+            if csr.address < region.origin:
+                diagnostics.append(Diagnostic("error", "register-outside-region",
+                    "register address 0x{:08x} is below the region origin 0x{:08x}".format(csr.address, region.origin),
+                    region.name, csr.name))
+            if csr.address % 4 != 0:
+                diagnostics.append(Diagnostic("warning", "register-unaligned",
+                    "register address 0x{:08x} is not word-aligned".format(csr.address),
+                    region.name, csr.name))
+            intervals.append((csr.address, csr.address + 4, csr))
+
+            # Consecutive parts of a wide CSR must step one word up in the
+            # address space and one bus word down in the bit range.
+            if previous is not None and is_sub_csr(csr) and is_sub_csr(previous) and csr.short_name == previous.short_name:
+                if csr.address != previous.address + 4 or csr.offset != previous.offset - region.busword:
+                    diagnostics.append(Diagnostic("error", "sub-csr-stride",
+                        "expected bits [{}:{}] at 0x{:08x} after `{}`, but found bits [{}:{}] at 0x{:08x}".format(
+                            previous.offset - 1, previous.offset - region.busword, previous.address + 4, previous.name,
+                            csr.offset + region.busword - 1, csr.offset, csr.address),
+                        region.name, csr.name))
+            previous = csr
+
+            validate_register(region, csr, diagnostics)
+
+        for mem in region.memories:
+            if mem.address < region.origin:
+                diagnostics.append(Diagnostic("error", "register-outside-region",
+                    "memory address 0x{:08x} is below the region origin 0x{:08x}".format(mem.address, region.origin),
+                    region.name, mem.name))
+            if mem.address % 4 != 0:
+                diagnostics.append(Diagnostic("warning", "register-unaligned",
+                    "memory address 0x{:08x} is not word-aligned".format(mem.address),
+                    region.name, mem.name))
+            if mem.depth <= 0 or mem.width <= 0:
+                diagnostics.append(Diagnostic("error", "memory-empty",
+                    "memory is {} x {} bits".format(mem.depth, mem.width),
+                    region.name, mem.name))
+            intervals.append((mem.address, mem.address + mem.size(), mem))
+
+        for (csr, other) in find_overlaps(intervals):
+            diagnostics.append(Diagnostic("error", "register-overlap",
+                "register at 0x{:08x} overlaps `{}`".format(csr.address, other.name),
+                region.name, csr.name))
+
+    for (name, other) in find_overlaps(region_intervals):
+        diagnostics.append(Diagnostic("error", "region-overlap",
+            "region overlaps region `{}`".format(other),
+            name))
+
+    return diagnostics
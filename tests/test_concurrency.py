@@ -0,0 +1,134 @@
+import io
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from migen import *
+from litex.soc.interconnect.csr import AutoCSR, CSRStorage, CSRStatus, CSRField
+from litex.soc.interconnect.csr_eventmanager import EventManager, EventSourceProcess, EventSourcePulse
+from litex.soc.integration.doc import AutoDoc, ModuleDoc
+
+import lxsocdoc
+from lxsocdoc.output import MemoryOutput
+from lxsocdoc.rst import make_table, print_table, reflow
+
+class Uart(Module, AutoCSR, AutoDoc, ModuleDoc):
+    """UART
+
+    Sends and receives bytes.
+    """
+    def __init__(self):
+        # Descriptions are indented and wrapped, so that reflow() changes them
+        self.ctrl = CSRStorage(fields=[
+            CSRField("en", size=1, reset=1, description="""
+                Enable the UART.  While this is `0`,
+                nothing is sent or received."""),
+            CSRField("mode", size=3, offset=1, values=[(0, "off"), (1, "on")], description="""
+                Operating mode of the UART.
+                Takes effect on the next byte."""),
+        ])
+        # Split across two bus words, so `split_fields` runs
+        self.cfg = CSRStorage(fields=[
+            CSRField("baud", size=12, offset=4, reset=0xabc, description="""
+                Baud rate divisor.  The top bits
+                live in the second register."""),
+        ])
+        self.div = CSRStorage(32, reset=0x1234, description="Divider")
+        self.stat = CSRStatus(16, description="Status")
+        self.submodules.ev = EventManager()
+        self.ev.rx = EventSourceProcess()
+        self.ev.tx = EventSourcePulse()
+        self.ev.finalize()
+        # Finalize the CSRs as the CSR bank would, to create the sub-CSRs
+        for csr in self.get_csrs():
+            csr.finalize(8, "big")
+
+class CSRRegion:
+    def __init__(self, origin, busword, obj):
+        self.origin = origin
+        self.busword = busword
+        self.obj = obj
+
+class SoC(Module):
+    def __init__(self, n):
+        self.csr_regions = {}
+        self.soc_interrupt_map = {}
+        for i in range(n):
+            name = "uart{}".format(i)
+            uart = Uart()
+            setattr(self.submodules, name, uart)
+            self.csr_regions[name] = CSRRegion(0xe0000000 + 0x800*i, 8, uart.get_csrs())
+            self.soc_interrupt_map[name] = i
+        self.mem = Memory(32, 64)
+        self.csr_regions["identifier_mem"] = CSRRegion(0xe0008000, 8, self.mem)
+
+def render(soc):
+    """Render every output into memory, twice, and return the files"""
+    output = MemoryOutput()
+    lxsocdoc.generate_docs(soc, output, quiet=True)
+    lxsocdoc.generate_docs(soc, output.subdir("again"), quiet=True)
+    lxsocdoc.generate_docs(soc, output.subdir("html"), quiet=True, backend="html")
+    lxsocdoc.generate_svd(soc, output)
+    return output.files
+
+def print_page(page):
+    """Render one page with print_region() and return it"""
+    stream = io.StringIO()
+    page.print_region(stream, "", False)
+    return stream.getvalue()
+
+class TestConcurrency(unittest.TestCase):
+    def check_parallel(self, socs):
+        serial = [render(soc) for soc in socs]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            parallel = list(pool.map(render, socs * 4))
+        for (i, files) in enumerate(parallel):
+            self.assertEqual(files, serial[i % len(socs)])
+
+    def test_live_socs(self):
+        self.check_parallel([SoC(2), SoC(3)])
+
+    def test_shared_model(self):
+        model = lxsocdoc.DocumentedSoC(SoC(2))
+        self.check_parallel([model])
+
+    def test_rendering_is_repeatable(self):
+        files = render(SoC(2))
+        for (name, contents) in files.items():
+            if name.startswith("again/"):
+                self.assertEqual(contents, files[name[len("again/"):]])
+
+    def test_pages_are_repeatable(self):
+        model = lxsocdoc.DocumentedSoC(SoC(2))
+        for page in model.regions + model.modules:
+            self.assertEqual(print_page(page), print_page(page))
+        interrupts = [module for module in model.modules if module.name == "interrupts"][0]
+        print_page(interrupts)
+        self.assertIn("| Interrupt | Module", print_page(interrupts))
+        # The sub-CSRs of split registers are rendered too
+        csrs = [csr.name for csr in model.regions[0].csrs]
+        self.assertIn("UART0_CFG1", csrs)
+        self.assertIn("UART0_CFG0", csrs)
+
+    def test_tables_are_not_modified(self):
+        table = [["Register", "Field"], ["CTRL", "en"], ["CFG", "baud"]]
+        rows = [list(row) for row in table]
+        first = io.StringIO()
+        print_table(table, first)
+        second = io.StringIO()
+        print_table(table, second)
+        self.assertEqual(second.getvalue(), first.getvalue())
+        self.assertIn("| Register | Field |", second.getvalue())
+        self.assertEqual(make_table(table), make_table(rows))
+        self.assertEqual(table, rows)
+
+    def test_inputs_are_not_modified(self):
+        soc = SoC(1)
+        fields = soc.uart0.ctrl.fields.fields + soc.uart0.cfg.fields.fields
+        descriptions = [f.description for f in fields]
+        for description in descriptions:
+            self.assertNotEqual(reflow(description), description)
+        render(soc)
+        self.assertEqual([f.description for f in fields], descriptions)
+
+if __name__ == "__main__":
+    unittest.main()